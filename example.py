@@ -3,7 +3,6 @@ import gradio as gr
 from gradio_floating_chatbot import (
     FloatingChatbot,
     FloatingChatbotConfig,
-    default_css,
     sample_chatbot_response,
 )
 
@@ -53,9 +52,6 @@ custom_css = """
 .my-msg { margin-top: 10px; }
 """  # noqa: E501
 
-# Combine default and custom CSS for the demo
-full_css = default_css + "\n" + custom_css
-
 with gr.Blocks() as demo:
     gr.Markdown("# Floating Chatbot Demo")
     gr.Textbox(lines=5, label="Textbox 0")
@@ -92,6 +88,7 @@ with gr.Blocks() as demo:
                 panel_chat_class="my-chat",
                 panel_msg_txt_class="my-msg",
                 max_height="10vh",
+                custom_css=custom_css,
             )
 
             bot2 = FloatingChatbot(custom_config)
@@ -113,4 +110,5 @@ with gr.Blocks() as demo:
     global_bot.create_layout()
     global_bot.define_events(sample_chatbot_response)
 
-demo.launch(css=full_css)
+# One minified stylesheet covering the CSS of every bot laid out above
+demo.launch(css=FloatingChatbot.build_css(demo))
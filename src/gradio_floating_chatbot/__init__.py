@@ -1,7 +1,28 @@
+from .attachments import Attachment as Attachment
+from .attachments import AttachmentStore as AttachmentStore
+from .cached_chatbot import CachedChatbot as CachedChatbot
+from .cached_chatbot import SessionHistory as SessionHistory
+from .conversations import ConversationStore as ConversationStore
+from .conversations import (
+    default_conversation_store as default_conversation_store,
+)
+from .css import build_css as build_css
 from .css import default_css as default_css
 from .css import default_css_class_names as default_css_class_names
+from .css import minify_css as minify_css
 from .floating_chatbot import FloatingChatbot as FloatingChatbot
 from .floating_chatbot import FloatingChatbotConfig as FloatingChatbotConfig
 from .floating_chatbot import (
     sample_chatbot_response as sample_chatbot_response,
 )
+from .icons import IconCache as IconCache
+from .icons import IconCacheMiddleware as IconCacheMiddleware
+from .icons import default_icon_cache as default_icon_cache
+from .profiling import SampledProfiler as SampledProfiler
+from .responders import FAQResponder as FAQResponder
+from .responders import ResponderChain as ResponderChain
+from .routing import HedgedRouter as HedgedRouter
+from .routing import LatencyTracker as LatencyTracker
+from .routing import RoutingPolicy as RoutingPolicy
+from .scheduling import PriorityScheduler as PriorityScheduler
+from .scheduling import default_scheduler as default_scheduler
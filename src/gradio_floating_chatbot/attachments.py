@@ -0,0 +1,160 @@
+__all__ = [
+    "Attachment",
+    "AttachmentStore",
+]
+
+import contextlib
+import hashlib
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+from dataclasses import dataclass
+
+import gradio as gr
+from gradio.utils import get_upload_folder
+
+
+@dataclass
+class Attachment:
+    """A file uploaded through the chat panel.
+
+    Uploads are streamed to disk by Gradio, so an attachment only holds the
+    path. Use ``open()`` for a file handle or ``mmap()`` for a read-only
+    memory map instead of reading the whole file into memory. Empty files
+    cannot be memory-mapped, so ``mmap()`` raises ``ValueError`` for them;
+    check ``size`` first.
+    """
+
+    path: str
+    name: str
+    size: int
+
+    def open(self):
+        return open(self.path, "rb")
+
+    def mmap(self) -> mmap.mmap:
+        if self.size == 0:
+            raise ValueError(f"Cannot memory-map empty file '{self.name}'.")
+        with open(self.path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()[:16]
+
+
+class AttachmentStore:
+    """Enforces upload size limits and tracks uploads per session.
+
+    Gradio stores identical uploads at the same path for every session, so
+    accepted files are hard-linked (or copied, across filesystems) into a
+    directory per session under ``storage_dir``, and only that directory is
+    deleted by ``cleanup`` when the session ends. The same upload sent twice
+    in a session counts once against the limits. Files above
+    ``max_file_size`` bytes, or that would take a session above
+    ``max_session_size`` bytes, are rejected with ``gr.Error``. The rejected
+    uploads are deleted from Gradio's upload folder; sessions that accepted
+    the same file keep their own link to it.
+    """
+
+    def __init__(
+        self,
+        max_file_size: int | None = None,
+        max_session_size: int | None = None,
+        storage_dir: str | None = None,
+    ):
+        self.max_file_size = max_file_size
+        self.max_session_size = max_session_size
+        self.storage_dir = storage_dir
+        # Accepted attachments per session, keyed by upload path.
+        self._sessions: dict[str, dict[str, Attachment]] = {}
+        self._lock = threading.Lock()
+
+    def session_size(self, session_id: str) -> int:
+        with self._lock:
+            session = self._sessions.get(session_id, {})
+            return sum(a.size for a in session.values())
+
+    def _session_dir(self, session_id: str) -> str:
+        if self.storage_dir is None:
+            # Next to Gradio's uploads, so hard links usually work.
+            os.makedirs(get_upload_folder(), exist_ok=True)
+            self.storage_dir = tempfile.mkdtemp(
+                prefix="gfc-attachments-", dir=get_upload_folder()
+            )
+        return os.path.join(self.storage_dir, _digest(session_id))
+
+    @staticmethod
+    def _link(src: str, dst: str):
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        try:
+            os.link(src, dst)
+        except FileExistsError:
+            pass
+        except OSError:
+            shutil.copyfile(src, dst)
+
+    @staticmethod
+    def _delete_uploads(paths):
+        # Only Gradio's own copies, never files passed in from elsewhere.
+        upload_folder = os.path.realpath(get_upload_folder())
+        for path in paths:
+            path = os.path.realpath(path)
+            if os.path.commonpath([path, upload_folder]) != upload_folder:
+                continue
+            with contextlib.suppress(OSError):
+                os.remove(path)
+                # Gradio stores each upload in a directory of its own.
+                if os.path.dirname(path) != upload_folder:
+                    os.rmdir(os.path.dirname(path))
+
+    def accept(self, session_id: str, paths: list[str]) -> list[Attachment]:
+        # Sizes come from the filesystem, the files are never read here.
+        uploads = {path: os.path.getsize(path) for path in paths}
+
+        for path, size in uploads.items():
+            if self.max_file_size is not None and size > self.max_file_size:
+                with self._lock:
+                    session = self._sessions.get(session_id, {})
+                    self._delete_uploads(
+                        [p for p in uploads if p not in session]
+                    )
+                raise gr.Error(
+                    f"'{os.path.basename(path)}' is {size} bytes, the "
+                    f"limit per file is {self.max_file_size} bytes."
+                )
+
+        with self._lock:
+            session = self._sessions.setdefault(session_id, {})
+            new = {p: s for p, s in uploads.items() if p not in session}
+            total = sum(a.size for a in session.values()) + sum(new.values())
+            if (
+                self.max_session_size is not None
+                and total > self.max_session_size
+            ):
+                self._delete_uploads(new)
+                raise gr.Error(
+                    f"Uploads for this session would total {total} bytes, "
+                    f"the limit is {self.max_session_size} bytes."
+                )
+
+            session_dir = self._session_dir(session_id)
+            for path, size in new.items():
+                name = os.path.basename(path)
+                dst = os.path.join(session_dir, _digest(path), name)
+                self._link(path, dst)
+                session[path] = Attachment(dst, name, size)
+            return [session[path] for path in paths]
+
+    def remove_session(self, session_id: str):
+        with self._lock:
+            if self._sessions.pop(session_id, None) is None:
+                return
+            session_dir = self._session_dir(session_id)
+        shutil.rmtree(session_dir, ignore_errors=True)
+
+    def cleanup(self, request: gr.Request):
+        # Registered with `Blocks.unload`, which passes the ending session.
+        self.remove_session(request.session_hash)
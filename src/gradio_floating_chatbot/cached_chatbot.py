@@ -0,0 +1,77 @@
+__all__ = [
+    "CachedChatbot",
+    "SessionHistory",
+]
+
+import threading
+from collections import OrderedDict
+
+import gradio as gr
+from gradio.components.chatbot import ChatbotDataMessages
+
+
+class SessionHistory(list):
+    """Chat history tagged with the session it belongs to.
+
+    Returned by the chat panel's submit function so ``CachedChatbot`` knows
+    whose processed messages to reuse; Gradio does not pass the session to
+    ``postprocess``.
+    """
+
+    def __init__(self, messages=(), session_id: str | None = None):
+        super().__init__(messages)
+        self.session_id = session_id
+
+
+class CachedChatbot(gr.Chatbot):
+    """``gr.Chatbot`` that only postprocesses the new messages of a turn.
+
+    The full history is returned on every turn, so postprocessing each
+    message again makes a conversation of n turns cost O(n^2). For a
+    ``SessionHistory``, the processed messages of the session's previous
+    turn are kept and only the appended messages are postprocessed. The
+    last one or two previously processed messages are postprocessed again
+    and compared, so a message that changed while streaming, or a history
+    that was replaced, is detected; earlier messages are assumed unchanged.
+    The last ``max_sessions`` sessions are kept. Plain lists are
+    postprocessed as by ``gr.Chatbot``.
+    """
+
+    # Render with the frontend of the parent ``gr.Chatbot``.
+    is_template = True
+
+    def __init__(self, *args, max_sessions: int = 256, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_sessions = max_sessions
+        # Postprocessed messages (or None) per session, one per message.
+        self._sessions: OrderedDict[str, list] = OrderedDict()
+        self._sessions_lock = threading.Lock()
+
+    def _reusable_prefix(self, value: list, processed: list) -> int:
+        n = min(len(value), len(processed))
+        for i in range(n - 1, max(n - 3, -1), -1):
+            if self._postprocess(value[i]) == processed[i]:
+                return i + 1
+        return 0
+
+    def postprocess(self, value) -> ChatbotDataMessages:
+        session_id = getattr(value, "session_id", None)
+        if session_id is None or self.max_sessions <= 0:
+            return super().postprocess(value)
+        self._check_format(value)
+
+        with self._sessions_lock:
+            previous = self._sessions.get(session_id, [])
+        prefix = self._reusable_prefix(value, previous) if previous else 0
+        processed = previous[:prefix] + [
+            self._postprocess(message) for message in value[prefix:]
+        ]
+
+        with self._sessions_lock:
+            self._sessions[session_id] = processed
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return ChatbotDataMessages(
+            root=[m for messages in processed if messages for m in messages]
+        )
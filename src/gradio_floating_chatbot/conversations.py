@@ -0,0 +1,192 @@
+__all__ = [
+    "ConversationStore",
+    "default_conversation_store",
+]
+
+import heapq
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+
+import gradio as gr
+
+
+_REQUIRED_FIELDS = {
+    "instance_name": str,
+    "session_id": str,
+    "created_at": (int, float),
+    "updated_at": (int, float),
+    "messages": list,
+}
+
+
+def _validate(conversation, line_number: int):
+    if not isinstance(conversation, dict):
+        raise ValueError(f"Line {line_number}: expected a JSON object.")
+    for key, types in _REQUIRED_FIELDS.items():
+        if not isinstance(conversation.get(key), types):
+            raise ValueError(
+                f"Line {line_number}: missing or invalid '{key}'."
+            )
+
+
+def _message_to_dict(message) -> dict:
+    if isinstance(message, gr.ChatMessage):
+        return {
+            "role": message.role,
+            "content": message.content,
+            "metadata": message.metadata,
+            "options": message.options,
+        }
+    return message
+
+
+class ConversationStore:
+    """Server-side record of chat histories, one per bot and session.
+
+    Each conversation is a dict with ``instance_name``, ``session_id``,
+    ``created_at``, ``updated_at`` (epoch seconds) and ``messages``. Exports
+    and imports are streamed as JSONL, one conversation per line.
+
+    At most ``max_conversations`` are kept, the least recently updated are
+    dropped first. Conversations not updated for ``max_age`` seconds are
+    dropped as well. ``None`` disables either limit.
+    """
+
+    def __init__(
+        self,
+        max_conversations: int | None = 10_000,
+        max_age: float | None = None,
+    ):
+        self.max_conversations = max_conversations
+        self.max_age = max_age
+        # Ordered from least to most recently updated.
+        self._conversations: OrderedDict[tuple[str, str], dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._conversations)
+
+    def _evict(self, now: float):
+        # Called with the lock held.
+        conversations = self._conversations
+        if self.max_conversations is not None:
+            while len(conversations) > self.max_conversations:
+                conversations.popitem(last=False)
+        if self.max_age is not None:
+            cutoff = now - self.max_age
+            while conversations:
+                oldest = next(iter(conversations.values()))
+                if oldest["updated_at"] >= cutoff:
+                    break
+                conversations.popitem(last=False)
+
+    def record(self, instance_name: str, session_id: str, history: list):
+        now = time.time()
+        key = (instance_name, session_id)
+        with self._lock:
+            conversation = self._conversations.get(key)
+            if conversation is None:
+                conversation = self._conversations[key] = {
+                    "instance_name": instance_name,
+                    "session_id": session_id,
+                    "created_at": now,
+                }
+            else:
+                self._conversations.move_to_end(key)
+            conversation["updated_at"] = now
+            # The history list is replaced, not mutated, on every turn.
+            conversation["messages"] = history
+            self._evict(now)
+
+    def iter_conversations(
+        self,
+        instance_name: str | None = None,
+        start: float | None = None,
+        end: float | None = None,
+    ) -> Iterator[dict]:
+        # Matching conversations are collected under the lock, so it is not
+        # held while yielding.
+        with self._lock:
+            conversations = [
+                conversation
+                for conversation in self._conversations.values()
+                if (
+                    instance_name is None
+                    or conversation["instance_name"] == instance_name
+                )
+                and (start is None or conversation["updated_at"] >= start)
+                and (end is None or conversation["updated_at"] < end)
+            ]
+        yield from conversations
+
+    def export_jsonl(
+        self,
+        instance_name: str | None = None,
+        start: float | None = None,
+        end: float | None = None,
+    ) -> Iterator[str]:
+        for conversation in self.iter_conversations(instance_name, start, end):
+            record = dict(conversation)
+            record["messages"] = [
+                _message_to_dict(m) for m in conversation["messages"]
+            ]
+            # Non-JSON content (components, attachments) is stored as text.
+            yield json.dumps(record, default=str) + "\n"
+
+    def import_jsonl(self, lines: Iterable[str], batch_size: int = 500) -> int:
+        """Restores exported conversations, ``batch_size`` lines at a time.
+
+        Imported conversations only fill the store, e.g. to export them again
+        or read them with ``iter_conversations``; they are not loaded back
+        into anyone's chat panel. They are kept in ``updated_at`` order with
+        the recorded ones, so the limits drop the least recently updated.
+
+        Raises ``ValueError`` on the first line that is not a conversation;
+        batches before it are already restored.
+        """
+        count = 0
+        batch = []
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            conversation = json.loads(line)
+            _validate(conversation, line_number)
+            batch.append(conversation)
+            if len(batch) >= batch_size:
+                count += self._restore(batch)
+                batch = []
+        if batch:
+            count += self._restore(batch)
+        return count
+
+    def _restore(self, batch: list[dict]) -> int:
+        now = time.time()
+        # Imported conversations may already be past ``max_age``.
+        if self.max_age is not None:
+            batch = [c for c in batch if c["updated_at"] >= now - self.max_age]
+        batch.sort(key=lambda c: c["updated_at"])
+        imported = [((c["instance_name"], c["session_id"]), c) for c in batch]
+        with self._lock:
+            for key, _ in imported:
+                self._conversations.pop(key, None)
+            # Merged by age, as eviction drops from the front.
+            self._conversations = OrderedDict(
+                heapq.merge(
+                    self._conversations.items(),
+                    imported,
+                    key=lambda item: item[1]["updated_at"],
+                )
+            )
+            self._evict(now)
+        return len(batch)
+
+    def clear(self):
+        with self._lock:
+            self._conversations.clear()
+
+
+# Shared by every FloatingChatbot unless another store is passed in.
+default_conversation_store = ConversationStore()
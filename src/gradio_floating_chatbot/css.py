@@ -1,8 +1,14 @@
 __all__ = [
+    "build_css",
     "default_css",
     "default_css_class_names",
+    "minify_css",
 ]
 
+import functools
+import re
+
+
 default_css = """
 .gfc-container {
   position: relative; /* parent must be relative for float btn in local mode */
@@ -104,3 +110,222 @@ default_css_class_names = {
     "panel_chat_class": "gfc-panel-chat",
     "panel_msg_txt_class": "gfc-panel-msg-txt",
 }
+
+# Classes added by `create_layout` on top of the configured ones.
+anchor_css_class_names = {
+    "fixed_class": "gfc-fixed",
+    "global_anchor_class": "gfc-global-anchor",
+}
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+_CLASS_RE = re.compile(r"\.(-?[_a-zA-Z][_a-zA-Z0-9-]*)")
+_STRING_RE = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')""")
+
+
+def _parse_rules(css: str) -> list[tuple[str, str]]:
+    """Splits a stylesheet into minified ``(selector, body)`` pairs.
+
+    At-rules such as ``@media`` are kept whole, with an empty body. So are
+    statements such as ``@import url(x);``, which end with a semicolon.
+    """
+    css = _COMMENT_RE.sub("", css)
+    rules = []
+    depth = 0
+    start = 0
+    selector = ""
+    quote = None
+    for i, char in enumerate(css):
+        if quote is not None:
+            if char == quote and css[i - 1] != "\\":
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char == ";" and depth == 0:
+            statement = _collapse_whitespace(css[start:i])
+            start = i + 1
+            if statement.startswith("@"):
+                rules.append((f"{statement};", ""))
+        elif char == "{":
+            if depth == 0:
+                selector = " ".join(css[start:i].split())
+                start = i + 1
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                body = css[start:i]
+                start = i + 1
+                if selector.startswith("@"):
+                    rules.append((_minify_at_rule(selector, body), ""))
+                else:
+                    rules.append(
+                        (_minify_selector(selector), _minify_body(body))
+                    )
+    return rules
+
+
+def _minify_selector(selector: str) -> str:
+    return re.sub(r"\s*([,>+~])\s*", r"\1", selector)
+
+
+def _split_declarations(body: str) -> list[str]:
+    # Semicolons inside strings or parentheses, e.g. in a data URI, do not
+    # end a declaration.
+    declarations = []
+    quote = None
+    depth = 0
+    start = 0
+    for i, char in enumerate(body):
+        if quote is not None:
+            if char == quote and body[i - 1] != "\\":
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth = max(depth - 1, 0)
+        elif char == ";" and depth == 0:
+            declarations.append(body[start:i])
+            start = i + 1
+    declarations.append(body[start:])
+    return declarations
+
+
+def _collapse_whitespace(value: str) -> str:
+    # Whitespace inside strings is kept as is.
+    parts = _STRING_RE.split(value)
+    parts[::2] = [re.sub(r"\s+", " ", part) for part in parts[::2]]
+    return "".join(parts).strip()
+
+
+def _minify_body(body: str) -> str:
+    declarations = []
+    for declaration in _split_declarations(body):
+        prop, sep, value = declaration.partition(":")
+        if not sep:
+            continue
+        value = _collapse_whitespace(value).replace(
+            " !important", "!important"
+        )
+        declarations.append(f"{prop.strip()}:{value}")
+    return ";".join(declarations)
+
+
+def _minify_at_rule(selector: str, body: str) -> str:
+    inner = "".join(f"{s}{{{b}}}" for s, b in _parse_rules(body))
+    return f"{selector}{{{inner}}}"
+
+
+def _join_rules(rules) -> str:
+    return "".join(s if s.startswith("@") else f"{s}{{{b}}}" for s, b in rules)
+
+
+def _dedupe(items):
+    # Keep the last copy of a duplicate, as it is the one that takes effect.
+    return reversed(dict.fromkeys(reversed(list(items))))
+
+
+def minify_css(css: str) -> str:
+    """Minifies a stylesheet and drops earlier copies of duplicate rules."""
+    return _join_rules(_dedupe(_parse_rules(css)))
+
+
+def _config_key(config) -> tuple:
+    classes = tuple(
+        getattr(config, field_name) or ""
+        for field_name in default_css_class_names
+    )
+    return (
+        config.use_default_css,
+        config.anchor_mode == "global",
+        classes,
+        getattr(config, "custom_css", None) or "",
+    )
+
+
+def _split_selectors(selector: str) -> list[str]:
+    # Commas inside :is(), :not() or attribute values do not split it.
+    selectors = []
+    depth = 0
+    start = 0
+    for i, char in enumerate(selector):
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth = max(depth - 1, 0)
+        elif char == "," and depth == 0:
+            selectors.append(selector[start:i])
+            start = i + 1
+    selectors.append(selector[start:])
+    return selectors
+
+
+def _anchor_rules() -> list[tuple[str, str]]:
+    # The global anchoring rules of the default CSS.
+    anchor_classes = set(anchor_css_class_names.values())
+    return [
+        (selector, body)
+        for selector, body in _parse_rules(default_css)
+        if set(_CLASS_RE.findall(selector)) & anchor_classes
+    ]
+
+
+@functools.lru_cache(maxsize=32)
+def _build_css(config_keys: tuple, extra_css: str) -> str:
+    used = set()
+    managed = set(default_css_class_names.values())
+    managed.update(anchor_css_class_names.values())
+    any_default = any_global = False
+    custom_stylesheets = []
+
+    for use_default_css, is_global, classes, custom_css in config_keys:
+        for class_names in classes:
+            used.update(class_names.split())
+            managed.update(class_names.split())
+        if is_global:
+            used.update(anchor_css_class_names.values())
+        any_default = any_default or use_default_css
+        any_global = any_global or is_global
+        if custom_css:
+            custom_stylesheets.append(custom_css)
+
+    # The default CSS comes first so the custom CSS of a bot overrides it.
+    rules = []
+    if any_default:
+        rules.extend(_parse_rules(default_css))
+    elif any_global:
+        # Global bots need the anchoring rules even without the default CSS.
+        rules.extend(_anchor_rules())
+    for css in [*dict.fromkeys(custom_stylesheets), extra_css]:
+        rules.extend(_parse_rules(css))
+
+    # Drop selectors that target a bot class that no config uses.
+    kept = []
+    for selector, body in rules:
+        if not selector.startswith("@"):
+            selector = ",".join(
+                s
+                for s in _split_selectors(selector)
+                if set(_CLASS_RE.findall(s)) & managed <= used
+            )
+            if not selector:
+                continue
+        kept.append((selector, body))
+    # Statements such as @import are only valid before any other rule.
+    kept = sorted(_dedupe(kept), key=lambda rule: not rule[0].endswith(";"))
+    return _join_rules(kept)
+
+
+def build_css(configs, extra_css: str = "") -> str:
+    """Builds one minified stylesheet for the given chatbot configs.
+
+    Includes the default CSS for configs with ``use_default_css``, followed
+    by the ``custom_css`` of the configs in the order they are given. Rules
+    for bot classes that none of the configs use are left out, as are
+    duplicate rules. ``extra_css`` is appended for the rest of the app.
+    Results are cached per list of configs.
+    """
+    # Unique config keys, in the order the bots were registered.
+    config_keys = tuple(dict.fromkeys(_config_key(c) for c in configs))
+    return _build_css(config_keys, extra_css)
@@ -6,13 +6,25 @@ __all__ = [
 
 import json
 import uuid
+import weakref
+from collections.abc import Iterable, Iterator
 from dataclasses import asdict, dataclass, field
 from typing import Callable, Literal
 
 import gradio as gr
 import yaml
+from gradio.context import Context
 
-from .css import default_css_class_names
+from .attachments import AttachmentStore
+from .cached_chatbot import CachedChatbot, SessionHistory
+from .conversations import ConversationStore, default_conversation_store
+from .css import build_css, default_css_class_names
+from .handlers import wrap_handler
+from .icons import default_icon_cache
+from .profiling import SampledProfiler
+from .responders import FAQResponder, Responder, ResponderChain
+from .routing import HedgedRouter, RoutingPolicy
+from .scheduling import PriorityScheduler, default_scheduler
 
 
 @dataclass
@@ -31,11 +43,36 @@ class FloatingChatbotConfig:
     title: str = "Chatbot"
     icon: str = "💬"
     icon_type: Literal["text", "image"] = "text"
+    # Shrink image icons to fit this many pixels (converted to PNG)
+    icon_size: int | None = None
 
     # Dimensions
     min_height: str = "180px"
     max_height: str = "50vh"
 
+    # File attachments in the chat input (sizes in bytes, None is unlimited)
+    multimodal: bool = False
+    max_file_size: int | None = None
+    max_session_upload_size: int | None = None
+
+    # Weight of this bot's response_fn calls in the shared scheduler
+    # (None runs them unscheduled, in Gradio's own queue)
+    priority: int | None = None
+
+    # Keep a server-side copy of each session's history for export
+    record_conversations: bool = False
+
+    # Sessions whose postprocessed messages are reused (0 disables it)
+    message_cache_sessions: int = 256
+
+    # Local FAQ answered before calling the response function
+    faq_path: str | None = None
+    faq_min_score: float = 0.6
+
+    # Profile 1 in N response_fn calls with cProfile (0 disables profiling)
+    profile_sample_rate: int = 0
+    profile_dir: str = "gfc-profiles"
+
     # CSS Classes (Default to None to allow validation logic)
     container_class: str | None = None
     float_btn_class: str | None = None
@@ -46,6 +83,9 @@ class FloatingChatbotConfig:
     panel_chat_class: str | None = None
     panel_msg_txt_class: str | None = None
 
+    # Stylesheet for the classes above, bundled by FloatingChatbot.build_css
+    custom_css: str | None = None
+
     def __post_init__(self):
         css_fields = [
             "container_class",
@@ -85,6 +125,11 @@ class FloatingChatbotConfig:
                     f"Missing: {', '.join(missing_fields)}"
                 )
 
+        if self.priority is not None and self.priority < 1:
+            raise ValueError(
+                f"'priority' must be at least 1, got {self.priority}."
+            )
+
     def to_dict(self):
         return asdict(self)
 
@@ -94,6 +139,11 @@ class FloatingChatbotConfig:
 
 
 class FloatingChatbot:
+    # Configs of the bots laid out in each Blocks, used by build_css().
+    registered_configs: weakref.WeakKeyDictionary[
+        gr.Blocks, list[FloatingChatbotConfig]
+    ] = weakref.WeakKeyDictionary()
+
     def __init__(
         self,
         config: FloatingChatbotConfig | dict | str | None = None,
@@ -102,6 +152,12 @@ class FloatingChatbot:
         self.setup_config(config, **kwargs)
         self.components = {}
         self.panel_id = None
+        self.faq_responder = None
+        self.router = None
+        self.profiler = None
+        self.attachments = None
+        self.conversations = None
+        self.scheduler = None
 
     def setup_config(
         self,
@@ -173,6 +229,13 @@ class FloatingChatbot:
             f"gfc-{self.config.instance_name}-{uuid.uuid4().hex[:4]}"
         )
 
+        if Context.root_block is not None:
+            configs = self.registered_configs.setdefault(
+                Context.root_block, []
+            )
+            if not any(c is self.config for c in configs):
+                configs.append(self.config)
+
         with gr.Column(elem_classes=container_cls) as container:
             anchor = None
             if anchor_factory and self.config.anchor_mode == "local":
@@ -184,9 +247,12 @@ class FloatingChatbot:
                 btn_cls += " gfc-fixed"
 
             if self.config.icon_type == "image":
+                # Bots sharing an icon file share one prepared copy.
                 float_btn = gr.Button(
                     "",
-                    icon=self.config.icon,
+                    icon=default_icon_cache.prepare(
+                        self.config.icon, self.config.icon_size
+                    ),
                     elem_classes=btn_cls,
                     min_width=1,
                 )
@@ -217,20 +283,36 @@ class FloatingChatbot:
                         min_width=1,
                         elem_classes=self.config.panel_close_btn_class,
                     )
-                chat = gr.Chatbot(
-                    height=None,
-                    min_height=self.config.min_height,
-                    max_height=self.config.max_height,
-                    show_label=False,
-                    elem_classes=self.config.panel_chat_class,
-                    allow_tags=False,
-                )
-                msg = gr.Textbox(
-                    placeholder="Type a message...",
-                    submit_btn=True,
-                    show_label=False,
-                    elem_classes=self.config.panel_msg_txt_class,
-                )
+                chat_kwargs = {
+                    "height": None,
+                    "min_height": self.config.min_height,
+                    "max_height": self.config.max_height,
+                    "show_label": False,
+                    "elem_classes": self.config.panel_chat_class,
+                    "allow_tags": False,
+                }
+                if self.config.message_cache_sessions > 0:
+                    chat = CachedChatbot(
+                        max_sessions=self.config.message_cache_sessions,
+                        **chat_kwargs,
+                    )
+                else:
+                    chat = gr.Chatbot(**chat_kwargs)
+                if self.config.multimodal:
+                    msg = gr.MultimodalTextbox(
+                        placeholder="Type a message...",
+                        submit_btn=True,
+                        show_label=False,
+                        file_count="multiple",
+                        elem_classes=self.config.panel_msg_txt_class,
+                    )
+                else:
+                    msg = gr.Textbox(
+                        placeholder="Type a message...",
+                        submit_btn=True,
+                        show_label=False,
+                        elem_classes=self.config.panel_msg_txt_class,
+                    )
 
         self.components = {
             "anchor": anchor,
@@ -244,6 +326,95 @@ class FloatingChatbot:
 
         return self.components
 
+    @classmethod
+    def build_css(
+        cls,
+        blocks: gr.Blocks | None = None,
+        extra_css: str = "",
+        configs: list[FloatingChatbotConfig] | None = None,
+    ) -> str:
+        """Builds the stylesheet for the bots laid out in ``blocks``.
+
+        ``blocks`` defaults to the Blocks currently being built. Pass
+        ``configs`` to build it for specific bots instead.
+        """
+        if configs is None:
+            configs = cls._blocks_configs(blocks)
+        return build_css(configs, extra_css)
+
+    @classmethod
+    def max_upload_size(
+        cls,
+        blocks: gr.Blocks | None = None,
+        configs: list[FloatingChatbotConfig] | None = None,
+    ) -> int | None:
+        """Per-file upload limit for ``Blocks.launch(max_file_size=...)``.
+
+        ``max_file_size`` of a bot is only checked once Gradio has received
+        the whole upload. Passing the largest limit of the multimodal bots in
+        ``blocks`` to ``launch`` makes Gradio reject bigger files while they
+        are uploaded. It applies to every upload of the app. ``None`` if a
+        multimodal bot has no limit, or no bot is multimodal.
+        """
+        if configs is None:
+            configs = cls._blocks_configs(blocks)
+        limits = [c.max_file_size for c in configs if c.multimodal]
+        if not limits or None in limits:
+            return None
+        return max(limits)
+
+    @classmethod
+    def _blocks_configs(
+        cls, blocks: gr.Blocks | None
+    ) -> list[FloatingChatbotConfig]:
+        # Defaults to the Blocks currently being built.
+        if blocks is None:
+            blocks = Context.root_block
+        if blocks is None:
+            return []
+        return cls.registered_configs.get(blocks, [])
+
+    def _make_submit_fn(self, fn: Callable) -> Callable:
+        """Adds attachment checks, conversation recording and session
+        tagging for the message cache around ``fn``.
+
+        The returned function is of the same kind as ``fn`` (sync, async or
+        generator) and takes the ``gr.Request`` of the session.
+        """
+        attachments = self.attachments
+        conversations = self.conversations
+        instance_name = self.config.instance_name
+        tag_session = isinstance(self.components.get("chat"), CachedChatbot)
+
+        def prepare(history, message, request):
+            if attachments is not None:
+                message = message or {}
+                files = attachments.accept(
+                    request.session_hash, message.get("files", [])
+                )
+                message = {"text": message.get("text", ""), "files": files}
+            return history, message
+
+        def process(result, request):
+            history, *rest = result
+            if tag_session and isinstance(history, list):
+                history = SessionHistory(history, request.session_hash)
+            return (history, *rest)
+
+        def finish(result, request):
+            if conversations is not None:
+                conversations.record(
+                    instance_name, request.session_hash, result[0]
+                )
+
+        return wrap_handler(
+            fn,
+            prepare=prepare,
+            process=process,
+            finish=finish,
+            with_request=True,
+        )
+
     @staticmethod
     def _show_panel(_):
         return gr.update(visible=True)
@@ -252,14 +423,42 @@ class FloatingChatbot:
     def _hide_panel(_):
         return gr.update(visible=False)
 
-    def define_events(
+    def build_responder_chain(
         self,
         response_fn: Callable[[list[gr.ChatMessage], str], tuple[list, str]],
+        responders: list[Responder] | None = None,
+    ) -> ResponderChain:
+        # The FAQ index is built once and reused by later calls.
+        if self.config.faq_path and self.faq_responder is None:
+            self.faq_responder = FAQResponder.from_file(
+                self.config.faq_path, min_score=self.config.faq_min_score
+            )
+
+        stages = []
+        if self.faq_responder is not None:
+            stages.append(self.faq_responder)
+        stages.extend(responders or [])
+        return ResponderChain(stages, response_fn)
+
+    def define_events(
+        self,
+        response_fn: Callable[[list[gr.ChatMessage], str], tuple[list, str]]
+        | list[Callable[[list[gr.ChatMessage], str], tuple[list, str]]],
+        responders: list[Responder] | None = None,
+        routing_policy: RoutingPolicy | None = None,
+        profiler: SampledProfiler | None = None,
+        conversation_store: ConversationStore | None = None,
+        scheduler: PriorityScheduler | None = None,
     ):
         if not self.components:
             raise RuntimeError(
                 "Components not initialized. Call create_layout() first."
             )
+        # Events, and the cleanup of uploads, are registered on the Blocks.
+        if Context.root_block is None:
+            raise AttributeError(
+                "define_events() must be called inside a gr.Blocks context."
+            )
 
         # This hidden textbox is used to pass the panel's ID to the JS functions
         # without creating a circular input/output dependency on the panel itself.
@@ -361,12 +560,96 @@ class FloatingChatbot:
         )
 
         # simple chatbot response -------------------------------------------------
-        msg.submit(response_fn, [chat, msg], [chat, msg])
+        # The profiler is always attached so it can be enabled at runtime.
+        self.profiler = profiler or SampledProfiler(
+            self.config.profile_dir, self.config.profile_sample_rate
+        )
+        name = self.config.instance_name
+
+        # Only response_fn itself is profiled, not the scheduler wait or the
+        # local responders. Several response functions are routed with
+        # hedging and failover; each backend is profiled on the router's
+        # threads, as `<instance_name>-backend<i>`.
+        if isinstance(response_fn, list):
+            backends = [
+                self.profiler.wrap(fn, f"{name}-backend{i}")
+                for i, fn in enumerate(response_fn)
+            ]
+            self.router = HedgedRouter(backends, routing_policy)
+            response_fn = self.router
+        else:
+            response_fn = self.profiler.wrap(response_fn, name)
+
+        # Local responders answer without waiting for a scheduler slot.
+        submit_kwargs = {}
+        if self.config.priority is not None:
+            self.scheduler = (
+                scheduler if scheduler is not None else default_scheduler
+            )
+            response_fn = self.scheduler.wrap(
+                response_fn, name, self.config.priority
+            )
+            # Calls are ordered by the scheduler instead of Gradio's queue.
+            submit_kwargs["concurrency_limit"] = None
+
+        # Without local responders, response_fn is used as is.
+        chain = self.build_responder_chain(response_fn, responders)
+        if chain.responders:
+            response_fn = chain.handler()
+
+        submit_fn = response_fn
+
+        # Uploads are size-checked per session and deleted when it ends.
+        if self.config.multimodal:
+            self.attachments = AttachmentStore(
+                self.config.max_file_size,
+                self.config.max_session_upload_size,
+            )
+            Context.root_block.unload(self.attachments.cleanup)
+
+        if self.config.record_conversations:
+            self.conversations = (
+                conversation_store
+                if conversation_store is not None
+                else default_conversation_store
+            )
+
+        if (
+            self.attachments is not None
+            or self.conversations is not None
+            or isinstance(chat, CachedChatbot)
+        ):
+            submit_fn = self._make_submit_fn(submit_fn)
+        msg.submit(submit_fn, [chat, msg], [chat, msg], **submit_kwargs)
+
+    def _conversation_store(self) -> ConversationStore:
+        if self.conversations is not None:
+            return self.conversations
+        return default_conversation_store
+
+    def export_conversations(
+        self,
+        instance_name: str | None = None,
+        start: float | None = None,
+        end: float | None = None,
+    ) -> Iterator[str]:
+        store = self._conversation_store()
+        return store.export_jsonl(instance_name, start, end)
+
+    def import_conversations(
+        self, lines: Iterable[str], batch_size: int = 500
+    ) -> int:
+        store = self._conversation_store()
+        return store.import_jsonl(lines, batch_size)
 
 
 def sample_chatbot_response(
-    history: list[gr.ChatMessage], message: str
+    history: list[gr.ChatMessage], message: str | dict
 ) -> tuple[list[gr.ChatMessage], str]:
+    # Multimodal input passes {"text": ..., "files": [Attachment, ...]}
+    if isinstance(message, dict):
+        names = ", ".join(a.name for a in message["files"])
+        message = f"{message['text']} [{names}]" if names else message["text"]
     history = history + [
         gr.ChatMessage(role="user", content=f"{message}"),
         gr.ChatMessage(role="assistant", content=f"Echo: {message}"),
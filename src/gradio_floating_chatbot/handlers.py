@@ -0,0 +1,156 @@
+__all__ = [
+    "handler_kind",
+    "wrap_handler",
+]
+
+import contextlib
+import functools
+import inspect
+from typing import Callable, Literal
+
+import gradio as gr
+
+
+HandlerKind = Literal["sync", "async", "generator", "async_generator"]
+
+
+def handler_kind(fn: Callable) -> HandlerKind:
+    """How Gradio will run ``fn``: plain, awaited, or iterated (streaming)."""
+    for candidate in (fn, getattr(fn, "__call__", None)):
+        if inspect.isasyncgenfunction(candidate):
+            return "async_generator"
+        if inspect.iscoroutinefunction(candidate):
+            return "async"
+        if inspect.isgeneratorfunction(candidate):
+            return "generator"
+    return "sync"
+
+
+def wrap_handler(
+    fn: Callable,
+    *,
+    shortcut: Callable | None = None,
+    prepare: Callable | None = None,
+    around: Callable | None = None,
+    process: Callable | None = None,
+    finish: Callable | None = None,
+    with_request: bool = False,
+) -> Callable:
+    """Wraps a chat handler while keeping its kind, so streaming still works.
+
+    - ``prepare(history, message, request)`` returns the ``(history,
+      message)`` passed on.
+    - ``shortcut(history, message)`` may return a result, in which case
+      ``fn`` is not called.
+    - ``around()`` may return a context manager held for the whole call,
+      including every step of a generator.
+    - ``process(result, request)`` returns the result passed on, for every
+      returned or yielded result.
+    - ``finish(result, request)`` receives the final (or last yielded)
+      result.
+
+    Without ``with_request`` the wrapper keeps the signature of ``fn`` and
+    forwards any extra arguments Gradio passes, such as ``gr.Request``.
+    With it, the wrapper takes ``request: gr.Request`` itself and the hooks
+    receive it.
+    """
+    kind = handler_kind(fn)
+
+    def start(history, message, args):
+        request = args[0] if with_request else None
+        if prepare is not None:
+            history, message = prepare(history, message, request)
+        answer = shortcut(history, message) if shortcut is not None else None
+        call_args = (history, message) + (() if with_request else args)
+        return request, call_args, answer
+
+    def context():
+        cm = around() if around is not None else None
+        return cm if cm is not None else contextlib.nullcontext()
+
+    def each(result, request):
+        if process is None or result is None:
+            return result
+        return process(result, request)
+
+    def end(result, request):
+        if finish is not None and result is not None:
+            finish(result, request)
+
+    if kind == "async":
+
+        async def handler(history, message, *args, **kwargs):
+            request, call_args, result = start(history, message, args)
+            if result is None:
+                with context():
+                    result = await fn(*call_args, **kwargs)
+            result = each(result, request)
+            end(result, request)
+            return result
+
+    elif kind == "async_generator":
+
+        async def handler(history, message, *args, **kwargs):
+            request, call_args, result = start(history, message, args)
+            if result is not None:
+                result = each(result, request)
+                yield result
+            else:
+                # Closing the wrapper closes fn's generator right away too.
+                with context():
+                    async with contextlib.aclosing(
+                        fn(*call_args, **kwargs)
+                    ) as results:
+                        async for result in results:
+                            result = each(result, request)
+                            yield result
+            end(result, request)
+
+    elif kind == "generator":
+
+        def handler(history, message, *args, **kwargs):
+            request, call_args, result = start(history, message, args)
+            if result is not None:
+                result = each(result, request)
+                yield result
+            else:
+                with context():
+                    with contextlib.closing(
+                        fn(*call_args, **kwargs)
+                    ) as results:
+                        for result in results:
+                            result = each(result, request)
+                            yield result
+            end(result, request)
+
+    else:
+
+        def handler(history, message, *args, **kwargs):
+            request, call_args, result = start(history, message, args)
+            if result is None:
+                with context():
+                    result = fn(*call_args, **kwargs)
+            result = each(result, request)
+            end(result, request)
+            return result
+
+    if with_request:
+        handler.__signature__ = inspect.Signature(
+            [
+                inspect.Parameter(
+                    "history", inspect.Parameter.POSITIONAL_ONLY
+                ),
+                inspect.Parameter(
+                    "message", inspect.Parameter.POSITIONAL_ONLY
+                ),
+                inspect.Parameter(
+                    "request",
+                    inspect.Parameter.POSITIONAL_ONLY,
+                    annotation=gr.Request,
+                ),
+            ]
+        )
+        # Gradio finds the gr.Request parameter through the annotations.
+        handler.__annotations__ = {"request": gr.Request}
+        return handler
+    return functools.wraps(fn)(handler)
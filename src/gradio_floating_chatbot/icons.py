@@ -0,0 +1,140 @@
+__all__ = [
+    "IconCache",
+    "IconCacheMiddleware",
+    "default_icon_cache",
+]
+
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import threading
+
+from gradio_client import utils as client_utils
+
+
+# Prepared icons are named after their content hash, which makes their URLs
+# safe to cache forever.
+ICON_PREFIX = "gfc-icon-"
+# File names written by IconCache.prepare.
+_ICON_NAME_RE = re.compile(
+    rf"{ICON_PREFIX}[0-9a-f]{{16}}(?:-\d+)?(?:\.[A-Za-z0-9]+)?"
+)
+
+
+class IconCache:
+    """Deduplicates image icons by content hash, optionally resizing them.
+
+    Each distinct icon file is hashed and prepared once per process, so bots
+    sharing an icon share one file and one URL. With ``size``, the icon is
+    shrunk to fit a ``size`` x ``size`` box and converted to PNG with Pillow.
+    Icons Pillow cannot open, such as SVGs, are copied unchanged instead.
+    URLs and missing files are returned unchanged.
+    """
+
+    def __init__(self, cache_dir: str | None = None):
+        self.cache_dir = cache_dir or os.path.join(
+            tempfile.gettempdir(), "gfc-icons"
+        )
+        self._prepared: dict[tuple, str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _hash_file(path: str) -> str:
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b""):
+                sha.update(chunk)
+        return sha.hexdigest()[:16]
+
+    @staticmethod
+    def _can_resize(path: str) -> bool:
+        import PIL.Image
+
+        try:
+            with PIL.Image.open(path):
+                return True
+        except PIL.UnidentifiedImageError:
+            return False
+
+    def _write(self, src: str, dst: str, size: int | None):
+        # Write to a temporary file first so readers never see partial icons.
+        tmp = f"{dst}.{threading.get_ident()}.tmp"
+        if size is None:
+            shutil.copyfile(src, tmp)
+        else:
+            import PIL.Image
+
+            with PIL.Image.open(src) as img:
+                img = img.convert("RGBA")
+            img.thumbnail((size, size))
+            img.save(tmp, format="PNG", optimize=True)
+        os.replace(tmp, dst)
+
+    def prepare(self, icon: str, size: int | None = None) -> str:
+        if client_utils.is_http_url_like(icon) or not os.path.isfile(icon):
+            return icon
+
+        stat = os.stat(icon)
+        key = (os.path.abspath(icon), stat.st_mtime_ns, stat.st_size, size)
+        with self._lock:
+            if key in self._prepared:
+                return self._prepared[key]
+
+        digest = self._hash_file(icon)
+        if size is not None and not self._can_resize(icon):
+            size = None
+        if size is None:
+            ext = os.path.splitext(icon)[1]
+            filename = f"{ICON_PREFIX}{digest}{ext}"
+        else:
+            filename = f"{ICON_PREFIX}{digest}-{size}.png"
+        path = os.path.join(self.cache_dir, filename)
+        if not os.path.exists(path):
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._write(icon, path, size)
+
+        with self._lock:
+            self._prepared[key] = path
+        return path
+
+
+class IconCacheMiddleware:
+    """ASGI middleware adding long-lived cache headers to prepared icons.
+
+    Install it on the Gradio app with
+    ``demo.launch(app_kwargs={"middleware": [Middleware(IconCacheMiddleware)]})``.
+    """
+
+    def __init__(self, app, max_age: int = 31536000):
+        self.app = app
+        self.cache_control = f"public, max-age={max_age}, immutable".encode()
+
+    async def __call__(self, scope, receive, send):
+        # Only the file name is matched, not directories or query strings.
+        if scope["type"] != "http" or not _ICON_NAME_RE.fullmatch(
+            scope["path"].rpartition("/")[2]
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cache_control(message):
+            if (
+                message["type"] == "http.response.start"
+                and message["status"] == 200
+            ):
+                headers = [
+                    (k, v)
+                    for k, v in message.get("headers", [])
+                    if k.lower() != b"cache-control"
+                ]
+                headers.append((b"cache-control", self.cache_control))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_cache_control)
+
+
+# Shared by every FloatingChatbot.
+default_icon_cache = IconCache()
@@ -0,0 +1,105 @@
+__all__ = [
+    "SampledProfiler",
+]
+
+import cProfile
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, ContextManager
+
+from .handlers import wrap_handler
+
+
+# Only one cProfile can be active per process, so samples are taken one at
+# a time across every SampledProfiler.
+_profile_lock = threading.Lock()
+
+
+class SampledProfiler:
+    """Profiles 1 in ``sample_rate`` calls of wrapped functions with cProfile.
+
+    Calls are counted separately per ``instance_name`` and each sampled call
+    writes a ``.prof`` file to ``output_dir``. A ``sample_rate`` of 0 turns
+    profiling off; it can be changed at runtime with ``set_sample_rate``.
+    Only one call is profiled at a time across all profilers; overlapping
+    samples, or samples while another profiling tool is active, are run
+    unprofiled.
+
+    Since Python 3.12 cProfile is process-wide: while a sample runs, calls
+    on every thread are recorded, including concurrent requests of other
+    bots, and the whole process runs slower. A report is a profile of the
+    process during one sampled call, not of that call alone, and is best
+    taken with little concurrent traffic.
+    """
+
+    def __init__(self, output_dir: str = "gfc-profiles", sample_rate: int = 0):
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self._counters: dict[str, int] = {}
+        self._counter_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def set_sample_rate(self, sample_rate: int):
+        self.sample_rate = sample_rate
+
+    def disable(self):
+        self.sample_rate = 0
+
+    def _next_count(self, instance_name: str) -> int:
+        with self._counter_lock:
+            count = self._counters.get(instance_name, 0) + 1
+            self._counters[instance_name] = count
+        return count
+
+    def _report_path(self, instance_name: str, count: int) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        timestamp = time.strftime("%Y%m%d-%H%M%S")
+        filename = f"{instance_name}-{timestamp}-{count}.prof"
+        return os.path.join(self.output_dir, filename)
+
+    @contextmanager
+    def _profile(self, instance_name: str, count: int):
+        if not _profile_lock.acquire(blocking=False):
+            yield
+            return
+        try:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiling tool is already active.
+                yield
+                return
+            try:
+                yield
+            finally:
+                profile.disable()
+                profile.dump_stats(self._report_path(instance_name, count))
+        finally:
+            _profile_lock.release()
+
+    def _sample(self, instance_name: str) -> ContextManager | None:
+        # Fast path, a single attribute check when profiling is off.
+        sample_rate = self.sample_rate
+        if sample_rate <= 0:
+            return None
+        count = self._next_count(instance_name)
+        if count % sample_rate != 0:
+            return None
+        return self._profile(instance_name, count)
+
+    def wrap(self, fn: Callable, instance_name: str) -> Callable:
+        """Wraps ``fn``, keeping it sync, async or a generator.
+
+        A sampled call is profiled from start to end, including every step
+        of a streaming response.
+        """
+        return wrap_handler(
+            fn, around=functools.partial(self._sample, instance_name)
+        )
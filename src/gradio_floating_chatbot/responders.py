@@ -0,0 +1,197 @@
+__all__ = [
+    "FAQResponder",
+    "ResponderChain",
+]
+
+import json
+import math
+import re
+from collections import Counter
+from typing import Callable
+
+import gradio as gr
+import yaml
+
+from .handlers import wrap_handler
+
+
+# A responder stage returns an answer string, or None to fall through.
+Responder = Callable[[list, str], str | None]
+
+_TOKEN_RE = re.compile(r"\w+")
+
+_STOPWORDS = frozenset(
+    {
+        "a", "an", "and", "are", "can", "do", "does", "for", "how", "i",
+        "in", "is", "it", "me", "my", "of", "on", "or", "the", "to",
+        "what", "where", "which", "who", "why", "with", "you", "your",
+    }
+)  # fmt: skip
+
+
+def _tokenize(text: str) -> list[str]:
+    tokens = _TOKEN_RE.findall(text.lower())
+    return [t for t in tokens if t not in _STOPWORDS]
+
+
+class FAQResponder:
+    """Answers questions from a local FAQ using an in-memory BM25 index.
+
+    The index is built once on construction. A question is answered only if
+    its best score, normalized by the larger of the matched entry's and the
+    question's score against themselves, reaches ``min_score``; otherwise
+    the responder returns ``None``. Terms of the question that no entry
+    uses therefore lower the confidence instead of being ignored.
+    """
+
+    def __init__(
+        self,
+        entries: list[dict],
+        min_score: float = 0.6,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        self.min_score = min_score
+        self.k1 = k1
+        self.b = b
+
+        self.answers: list[str] = []
+        self._doc_lengths: list[int] = []
+        self._postings: dict[str, list[tuple[int, int]]] = {}
+
+        docs = []
+        for entry in entries:
+            # Each entry may list alternative phrasings of its question.
+            questions = entry.get("questions") or [entry["question"]]
+            for question in questions:
+                docs.append(_tokenize(question))
+                self.answers.append(entry["answer"])
+
+        for doc_id, tokens in enumerate(docs):
+            self._doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                self._postings.setdefault(term, []).append((doc_id, tf))
+
+        n_docs = len(docs)
+        self._avg_length = sum(self._doc_lengths) / n_docs if n_docs else 0.0
+        self._idf = {
+            term: math.log(1 + (n_docs - len(p) + 0.5) / (len(p) + 0.5))
+            for term, p in self._postings.items()
+        }
+        # Weight of a query term that no entry contains.
+        self._unseen_idf = math.log(1 + (n_docs + 0.5) / 0.5)
+        # Score of every entry against its own question, used to normalize.
+        self._self_scores = [
+            self._scores(tokens).get(doc_id, 0.0)
+            for doc_id, tokens in enumerate(docs)
+        ]
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "FAQResponder":
+        with open(path, "r") as f:
+            if path.endswith(".yaml") or path.endswith(".yml"):
+                data = yaml.safe_load(f)
+            else:
+                data = json.load(f)
+
+        if not isinstance(data, list) or not data:
+            raise ValueError(
+                f"FAQ file '{path}' must contain a non-empty list of entries."
+            )
+        for i, entry in enumerate(data):
+            if (
+                not isinstance(entry, dict)
+                or "answer" not in entry
+                or not (entry.get("question") or entry.get("questions"))
+            ):
+                raise ValueError(
+                    f"FAQ entry {i} in '{path}' must be a mapping with an "
+                    "'answer' and a 'question' or 'questions'."
+                )
+        return cls(data, **kwargs)
+
+    def _scores(self, tokens: list[str]) -> dict[int, float]:
+        scores: dict[int, float] = {}
+        for term in set(tokens):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, tf in self._postings[term]:
+                length_ratio = self._doc_lengths[doc_id] / self._avg_length
+                norm = 1 - self.b + self.b * length_ratio
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * (
+                    tf * (self.k1 + 1) / (tf + self.k1 * norm)
+                )
+        return scores
+
+    def _query_self_score(self, tokens: list[str]) -> float:
+        # Score of the query as if it were an entry matched against itself.
+        length_ratio = len(tokens) / self._avg_length
+        norm = 1 - self.b + self.b * length_ratio
+        return sum(
+            self._idf.get(term, self._unseen_idf)
+            * (tf * (self.k1 + 1) / (tf + self.k1 * norm))
+            for term, tf in Counter(tokens).items()
+        )
+
+    def lookup(self, message: str) -> str | None:
+        tokens = _tokenize(message)
+        scores = self._scores(tokens)
+        if not scores:
+            return None
+        doc_id = max(scores, key=scores.__getitem__)
+        best = max(self._self_scores[doc_id], self._query_self_score(tokens))
+        if best <= 0 or scores[doc_id] / best < self.min_score:
+            return None
+        return self.answers[doc_id]
+
+    def __call__(self, history: list, message: str) -> str | None:
+        return self.lookup(message)
+
+
+class ResponderChain:
+    """Tries each responder in order before calling the fallback function.
+
+    Calling the chain runs it synchronously. ``handler()`` returns a wrapper
+    of the same kind as the fallback (sync, async or generator), suitable
+    for ``msg.submit``.
+    """
+
+    def __init__(
+        self,
+        responders: list[Responder],
+        fallback: Callable[[list, str], tuple[list, str]],
+    ):
+        self.responders = list(responders)
+        self.fallback = fallback
+
+    def answer(
+        self, history: list, message: str | dict
+    ) -> tuple[list, str] | None:
+        """Returns the chat update of the first responder that answers."""
+        # Multimodal messages with attachments always go to the fallback.
+        if isinstance(message, dict):
+            if message.get("files"):
+                return None
+            text = message.get("text", "")
+        else:
+            text = message
+
+        for responder in self.responders:
+            answer = responder(history, text)
+            if answer is not None:
+                history = history + [
+                    gr.ChatMessage(role="user", content=f"{text}"),
+                    gr.ChatMessage(role="assistant", content=answer),
+                ]
+                return history, ""
+        return None
+
+    def handler(self) -> Callable:
+        return wrap_handler(self.fallback, shortcut=self.answer)
+
+    def __call__(self, history: list, message: str | dict) -> tuple[list, str]:
+        result = self.answer(history, message)
+        if result is not None:
+            return result
+        return self.fallback(history, message)
@@ -0,0 +1,156 @@
+__all__ = [
+    "HedgedRouter",
+    "LatencyTracker",
+    "RoutingPolicy",
+]
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass
+from typing import Callable
+
+from .handlers import handler_kind
+
+
+@dataclass
+class RoutingPolicy:
+    # Percentile of a backend's rolling latency after which the next
+    # backend is hedged in.
+    hedge_percentile: float = 0.95
+    # Number of recent successful calls kept per backend.
+    window_size: int = 100
+    # Below this many samples, `initial_hedge_delay` is used instead.
+    min_samples: int = 20
+    initial_hedge_delay: float = 2.0
+    # If False, backends are only tried in order when one fails.
+    hedge: bool = True
+    max_workers: int | None = None
+
+
+class LatencyTracker:
+    """Rolling window of call latencies (in seconds) for one backend."""
+
+    def __init__(self, window_size: int = 100):
+        self._samples = deque(maxlen=window_size)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._samples)
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        idx = min(len(samples) - 1, int(q * len(samples)))
+        return samples[idx]
+
+
+class HedgedRouter:
+    """Routes a chat turn across several response functions.
+
+    Backends are tried in order. If the current backend has not answered
+    within its rolling ``hedge_percentile`` latency, the next backend is
+    started as well and the first successful answer wins; the others are
+    cancelled if they have not started yet, otherwise their results are
+    discarded. A backend that raises is failed over to the next one
+    immediately. If every backend fails, the last error is raised.
+    """
+
+    def __init__(
+        self,
+        backends: list[Callable[[list, str], tuple[list, str]]],
+        policy: RoutingPolicy | None = None,
+    ):
+        if not backends:
+            raise ValueError("HedgedRouter requires at least one backend.")
+        # Backends run on executor threads and are timed per call, which
+        # only works for plain functions.
+        for backend in backends:
+            if handler_kind(backend) != "sync":
+                raise TypeError(
+                    "HedgedRouter backends must be sync functions, got "
+                    f"{handler_kind(backend)} function {backend!r}."
+                )
+        self.backends = list(backends)
+        self.policy = policy or RoutingPolicy()
+        self.trackers = [
+            LatencyTracker(self.policy.window_size) for _ in self.backends
+        ]
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.policy.max_workers,
+            thread_name_prefix="gfc-router",
+        )
+
+    def hedge_delay(self, idx: int) -> float:
+        tracker = self.trackers[idx]
+        if len(tracker) < self.policy.min_samples:
+            return self.policy.initial_hedge_delay
+        return tracker.percentile(self.policy.hedge_percentile)
+
+    def _call_backend(self, idx: int, history: list, message: str):
+        start = time.perf_counter()
+        result = self.backends[idx](history, message)
+        self.trackers[idx].record(time.perf_counter() - start)
+        return result
+
+    def __call__(self, history: list, message: str) -> tuple[list, str]:
+        pending: dict[Future, int] = {}
+        next_idx = 0
+        hedge_deadline = None
+        last_error = None
+
+        def launch():
+            nonlocal next_idx, hedge_deadline
+            future = self._executor.submit(
+                self._call_backend, next_idx, history, message
+            )
+            pending[future] = next_idx
+            if self.policy.hedge:
+                hedge_deadline = time.monotonic() + self.hedge_delay(next_idx)
+            next_idx += 1
+
+        launch()
+        while pending:
+            timeout = None
+            if hedge_deadline is not None and next_idx < len(self.backends):
+                timeout = max(0.0, hedge_deadline - time.monotonic())
+
+            done, _ = wait(
+                pending, timeout=timeout, return_when=FIRST_COMPLETED
+            )
+            if not done:
+                # The current backend is slower than usual, hedge.
+                launch()
+                continue
+
+            for future in done:
+                pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    last_error = e
+                    # Fail over right away, even if a hedged call is still
+                    # in flight.
+                    if next_idx < len(self.backends):
+                        launch()
+                    continue
+                for loser in pending:
+                    loser.cancel()
+                return result
+
+        raise last_error
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,187 @@
+__all__ = [
+    "PriorityScheduler",
+    "default_scheduler",
+]
+
+import asyncio
+import contextlib
+import functools
+import itertools
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable
+
+import anyio
+
+from .handlers import handler_kind
+
+
+_DONE = object()
+
+
+@dataclass(order=True)
+class _Ticket:
+    finish_tag: float
+    seq: int
+    instance_name: str = field(compare=False)
+    priority: int = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    loop: asyncio.AbstractEventLoop = field(compare=False, repr=False)
+    event: asyncio.Event = field(compare=False, repr=False)
+    granted: bool = field(default=False, compare=False)
+
+
+class PriorityScheduler:
+    """Weighted fair queuing of response function calls across bots.
+
+    At most ``max_concurrency`` calls run at once. Waiting calls are
+    dispatched by weighted fair queuing over ``instance_name``, with the
+    bot's ``priority`` as its weight, so a bot with priority 4 gets about
+    four times the share of a bot with priority 1 under contention. A call
+    that has waited longer than ``max_wait`` seconds is dispatched first
+    regardless of its weight to prevent starvation.
+
+    Waiting calls await on the event loop and do not hold a worker thread,
+    so any number of them can queue up without exhausting Gradio's thread
+    pool. Sync response functions run in a worker thread once dispatched.
+    """
+
+    def __init__(self, max_concurrency: int = 4, max_wait: float = 30.0):
+        self.max_concurrency = max_concurrency
+        self.max_wait = max_wait
+        self.active = 0
+        self._pending: list[_Ticket] = []
+        self._last_finish: dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def queue_depth(self) -> dict[int, int]:
+        """Number of waiting calls per priority."""
+        with self._lock:
+            return dict(Counter(t.priority for t in self._pending))
+
+    def _next_ticket(self) -> _Ticket:
+        oldest = min(self._pending, key=lambda t: t.seq)
+        if time.monotonic() - oldest.enqueued_at >= self.max_wait:
+            return oldest
+        return min(self._pending)
+
+    def _dispatch(self):
+        # Runs whenever a call is queued or a slot is released.
+        with self._lock:
+            while self._pending and self.active < self.max_concurrency:
+                ticket = self._next_ticket()
+                self._pending.remove(ticket)
+                self._virtual_time = max(self._virtual_time, ticket.finish_tag)
+                self.active += 1
+                ticket.granted = True
+                ticket.loop.call_soon_threadsafe(ticket.event.set)
+
+    def _release(self):
+        with self._lock:
+            self.active -= 1
+        self._dispatch()
+
+    @contextlib.asynccontextmanager
+    async def slot(self, instance_name: str, priority: int = 1):
+        with self._lock:
+            start = max(
+                self._virtual_time, self._last_finish.get(instance_name, 0.0)
+            )
+            ticket = _Ticket(
+                finish_tag=start + 1 / max(priority, 1),
+                seq=next(self._seq),
+                instance_name=instance_name,
+                priority=priority,
+                enqueued_at=time.monotonic(),
+                loop=asyncio.get_running_loop(),
+                event=asyncio.Event(),
+            )
+            previous_finish = self._last_finish.get(instance_name)
+            self._last_finish[instance_name] = ticket.finish_tag
+            self._pending.append(ticket)
+        self._dispatch()
+
+        try:
+            await ticket.event.wait()
+        except BaseException:
+            # Cancelled while waiting, e.g. the user closed the page.
+            with self._lock:
+                granted = ticket.granted
+                if not granted:
+                    self._pending.remove(ticket)
+                    # The call never ran, so it does not count against the
+                    # bot's share unless later calls were queued after it.
+                    if self._last_finish.get(instance_name) == (
+                        ticket.finish_tag
+                    ):
+                        if previous_finish is None:
+                            del self._last_finish[instance_name]
+                        else:
+                            self._last_finish[instance_name] = previous_finish
+            if granted:
+                self._release()
+            raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    def wrap(
+        self, fn: Callable, instance_name: str, priority: int = 1
+    ) -> Callable:
+        """Runs ``fn`` in a slot, returning an async function or generator.
+
+        Sync functions are called, and generators stepped, in a worker thread
+        only while the call holds a slot.
+        """
+        if priority < 1:
+            raise ValueError(f"priority must be at least 1, got {priority}.")
+        kind = handler_kind(fn)
+
+        if kind == "async":
+
+            async def wrapper(*args, **kwargs):
+                async with self.slot(instance_name, priority):
+                    return await fn(*args, **kwargs)
+
+        elif kind == "async_generator":
+
+            async def wrapper(*args, **kwargs):
+                async with self.slot(instance_name, priority):
+                    # Closing the wrapper closes fn's generator right away.
+                    async with contextlib.aclosing(
+                        fn(*args, **kwargs)
+                    ) as items:
+                        async for item in items:
+                            yield item
+
+        elif kind == "generator":
+
+            async def wrapper(*args, **kwargs):
+                async with self.slot(instance_name, priority):
+                    with contextlib.closing(fn(*args, **kwargs)) as iterator:
+                        while True:
+                            item = await anyio.to_thread.run_sync(
+                                next, iterator, _DONE
+                            )
+                            if item is _DONE:
+                                break
+                            yield item
+
+        else:
+
+            async def wrapper(*args, **kwargs):
+                async with self.slot(instance_name, priority):
+                    return await anyio.to_thread.run_sync(
+                        functools.partial(fn, *args, **kwargs)
+                    )
+
+        return functools.wraps(fn)(wrapper)
+
+
+# Shared by every FloatingChatbot with a priority unless another is passed.
+default_scheduler = PriorityScheduler()
@@ -0,0 +1,155 @@
+import os
+
+import gradio as gr
+import pytest
+
+from gradio_floating_chatbot import (
+    AttachmentStore,
+    FloatingChatbot,
+    FloatingChatbotConfig,
+    sample_chatbot_response,
+)
+
+
+def _upload(tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(b"x" * size)
+    return str(path)
+
+
+def test_attachment_open_and_mmap(tmp_path):
+    store = AttachmentStore(storage_dir=str(tmp_path / "store"))
+    (attachment,) = store.accept("s1", [_upload(tmp_path, "a.txt", 10)])
+    assert attachment.name == "a.txt"
+    assert attachment.size == 10
+
+    with attachment.open() as f:
+        assert f.read(3) == b"xxx"
+    with attachment.mmap() as m:
+        assert len(m) == 10
+
+    (empty,) = store.accept("s1", [_upload(tmp_path, "empty.txt", 0)])
+    with pytest.raises(ValueError, match="empty file"):
+        empty.mmap()
+
+
+def test_attachment_max_file_size(tmp_path, monkeypatch):
+    monkeypatch.setenv("GRADIO_TEMP_DIR", str(tmp_path / "gradio"))
+    store = AttachmentStore(max_file_size=5)
+    upload_dir = tmp_path / "gradio" / "abc123"
+    upload_dir.mkdir(parents=True)
+    small = _upload(upload_dir, "small.bin", 1)
+    big = _upload(upload_dir, "big.bin", 10)
+    with pytest.raises(gr.Error, match="limit per file is 5 bytes"):
+        store.accept("s1", [small, big])
+    # Rejected uploads are deleted from Gradio's upload folder
+    assert not upload_dir.exists()
+    assert store.session_size("s1") == 0
+
+    # Files outside of it are left alone
+    path = _upload(tmp_path, "big.bin", 10)
+    with pytest.raises(gr.Error, match="limit per file is 5 bytes"):
+        store.accept("s1", [path])
+    assert os.path.exists(path)
+
+
+def test_attachment_max_session_size(tmp_path):
+    store = AttachmentStore(
+        max_session_size=15, storage_dir=str(tmp_path / "store")
+    )
+    store.accept("s1", [_upload(tmp_path, "a.bin", 10)])
+    assert store.session_size("s1") == 10
+
+    with pytest.raises(gr.Error, match="limit is 15 bytes"):
+        store.accept("s1", [_upload(tmp_path, "b.bin", 10)])
+    # Other sessions have their own budget
+    store.accept("s2", [_upload(tmp_path, "c.bin", 10)])
+    assert store.session_size("s1") == 10
+
+
+def test_attachment_remove_session(tmp_path):
+    store = AttachmentStore(storage_dir=str(tmp_path / "store"))
+    (a,) = store.accept("s1", [_upload(tmp_path, "a.bin", 1)])
+    (b,) = store.accept("s2", [_upload(tmp_path, "b.bin", 1)])
+
+    store.remove_session("s1")
+    assert not os.path.exists(a.path)
+    assert os.path.exists(b.path)
+    assert (tmp_path / "a.bin").exists()
+    assert store.session_size("s1") == 0
+
+
+def test_attachment_shared_upload(tmp_path):
+    # Gradio stores the same upload at the same path for every session
+    store = AttachmentStore(
+        max_session_size=15, storage_dir=str(tmp_path / "store")
+    )
+    path = _upload(tmp_path, "a.bin", 10)
+    (a1,) = store.accept("s1", [path])
+    (a2,) = store.accept("s2", [path])
+    assert a1.path != a2.path
+
+    # Sending it again in the same session does not count twice
+    assert store.accept("s1", [path, path]) == [a1, a1]
+    assert store.session_size("s1") == 10
+
+    # Rejecting an upload for one session leaves the others' files alone
+    with pytest.raises(gr.Error, match="limit is 15 bytes"):
+        store.accept("s2", [_upload(tmp_path, "b.bin", 10)])
+    store.remove_session("s1")
+    assert os.path.exists(path)
+    with a2.open() as f:
+        assert f.read() == b"x" * 10
+
+
+def test_sample_chatbot_response_multimodal(tmp_path):
+    store = AttachmentStore(storage_dir=str(tmp_path / "store"))
+    files = store.accept("s1", [_upload(tmp_path, "a.txt", 1)])
+    history, _ = sample_chatbot_response([], {"text": "hi", "files": files})
+    assert history[1].content == "Echo: hi [a.txt]"
+
+
+def test_layout_multimodal(tmp_path):
+    config = FloatingChatbotConfig(multimodal=True, max_file_size=5)
+    bot = FloatingChatbot(config)
+    with gr.Blocks():
+        components = bot.create_layout()
+        bot.define_events(sample_chatbot_response)
+
+    assert isinstance(components["msg"], gr.MultimodalTextbox)
+    assert bot.attachments.max_file_size == 5
+
+    request = gr.Request(session_hash="s1")
+    submit = bot._make_submit_fn(sample_chatbot_response)
+    path = _upload(tmp_path, "a.txt", 1)
+    history, _ = submit([], {"text": "hi", "files": [path]}, request)
+    assert history[1].content == "Echo: hi [a.txt]"
+
+    assert bot.attachments.session_size("s1") == 1
+    bot.attachments.cleanup(request)
+    assert bot.attachments.session_size("s1") == 0
+    assert (tmp_path / "a.txt").exists()
+
+
+def test_max_upload_size():
+    with gr.Blocks() as demo:
+        for size in [5, 10]:
+            config = FloatingChatbotConfig(multimodal=True, max_file_size=size)
+            FloatingChatbot(config).create_layout()
+        FloatingChatbot().create_layout()
+    assert FloatingChatbot.max_upload_size(demo) == 10
+
+    # Unlimited when any multimodal bot is unlimited, or none is multimodal
+    configs = [FloatingChatbotConfig(multimodal=True, max_file_size=5)]
+    configs.append(FloatingChatbotConfig(multimodal=True))
+    assert FloatingChatbot.max_upload_size(configs=configs) is None
+    configs = [FloatingChatbotConfig(max_file_size=5)]
+    assert FloatingChatbot.max_upload_size(configs=configs) is None
+
+
+def test_define_events_outside_blocks():
+    bot = FloatingChatbot(FloatingChatbotConfig(multimodal=True))
+    with gr.Blocks():
+        bot.create_layout()
+    with pytest.raises(AttributeError, match="gr.Blocks"):
+        bot.define_events(sample_chatbot_response)
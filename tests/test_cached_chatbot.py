@@ -0,0 +1,103 @@
+import gradio as gr
+
+from gradio_floating_chatbot import (
+    CachedChatbot,
+    FloatingChatbot,
+    FloatingChatbotConfig,
+    SessionHistory,
+    sample_chatbot_response,
+)
+
+
+def _turn(chat, history, message, session_id="s1"):
+    # One chat turn, including the round trip through the frontend.
+    history, _ = sample_chatbot_response(history, message)
+    return chat.preprocess(
+        chat.postprocess(SessionHistory(history, session_id))
+    )
+
+
+def test_cached_postprocess_matches_chatbot():
+    history, _ = sample_chatbot_response([], "hi")
+    history.append({"role": "user", "content": "dict message"})
+
+    expected = gr.Chatbot().postprocess(history)
+    chat = CachedChatbot()
+    assert chat.postprocess(history) == expected
+    assert chat.postprocess(SessionHistory(history, "s1")) == expected
+    # Second turn, served from the session's processed messages
+    assert chat.postprocess(SessionHistory(history, "s1")) == expected
+
+
+def test_cached_postprocess_only_new_messages(mocker):
+    chat = CachedChatbot()
+    history = []
+    for i in range(100):
+        history = _turn(chat, history, str(i))
+
+    spy = mocker.spy(gr.Chatbot, "_postprocess")
+    history = _turn(chat, history, "last")
+    # The two new messages, plus the previous last message as a check,
+    # instead of all 202
+    assert spy.call_count == 3
+    assert history[-1]["content"][0]["text"] == "Echo: last"
+
+
+def test_cached_postprocess_streaming():
+    chat = CachedChatbot()
+    history, _ = sample_chatbot_response([], "hi")
+    chat.postprocess(SessionHistory(history, "s1"))
+
+    # The last message grows while it is streamed
+    for text in ["Echo", "Echo: h", "Echo: hi!"]:
+        history = history[:-1] + [
+            gr.ChatMessage(role="assistant", content=text)
+        ]
+        result = chat.postprocess(SessionHistory(history, "s1"))
+        assert result == gr.Chatbot().postprocess(history)
+
+
+def test_cached_postprocess_replaced_history():
+    chat = CachedChatbot()
+    history, _ = sample_chatbot_response([], "one")
+    chat.postprocess(SessionHistory(history, "s1"))
+
+    history, _ = sample_chatbot_response([], "two")
+    result = chat.postprocess(SessionHistory(history, "s1"))
+    assert result.root[0].content[0].text == "two"
+
+
+def test_cached_postprocess_sessions():
+    chat = CachedChatbot(max_sessions=2)
+    for session_id in ["a", "b", "c"]:
+        history, _ = sample_chatbot_response([], session_id)
+        result = chat.postprocess(SessionHistory(history, session_id))
+        assert result.root[0].content[0].text == session_id
+    assert list(chat._sessions) == ["b", "c"]
+
+    # Plain lists are not cached
+    chat.postprocess(sample_chatbot_response([], "plain")[0])
+    assert list(chat._sessions) == ["b", "c"]
+
+
+def test_cached_chatbot_block_name():
+    assert CachedChatbot().get_block_name() == "chatbot"
+
+
+def test_layout_message_cache():
+    bot = FloatingChatbot()
+    with gr.Blocks():
+        components = bot.create_layout()
+        bot.define_events(sample_chatbot_response)
+    assert isinstance(components["chat"], CachedChatbot)
+
+    # The submit function tags the history with the session
+    submit = bot._make_submit_fn(sample_chatbot_response)
+    history, _ = submit([], "hi", gr.Request(session_hash="s1"))
+    assert isinstance(history, SessionHistory)
+    assert history.session_id == "s1"
+
+    bot = FloatingChatbot(FloatingChatbotConfig(message_cache_sessions=0))
+    with gr.Blocks():
+        components = bot.create_layout()
+    assert not isinstance(components["chat"], CachedChatbot)
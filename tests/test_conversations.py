@@ -0,0 +1,243 @@
+import asyncio
+import inspect
+import json
+import time
+
+import gradio as gr
+import pytest
+
+from gradio_floating_chatbot import (
+    ConversationStore,
+    FloatingChatbot,
+    FloatingChatbotConfig,
+    default_conversation_store,
+    sample_chatbot_response,
+)
+
+
+def _history(message):
+    history, _ = sample_chatbot_response([], message)
+    return history
+
+
+def test_store_record_and_export():
+    store = ConversationStore()
+    store.record("bot-a", "s1", _history("one"))
+    store.record("bot-a", "s1", _history("two"))
+    store.record("bot-b", "s2", _history("three"))
+    assert len(store) == 2
+
+    lines = list(store.export_jsonl())
+    assert len(lines) == 2
+    record = json.loads(lines[0])
+    assert record["instance_name"] == "bot-a"
+    assert record["session_id"] == "s1"
+    assert record["messages"][0] == {
+        "role": "user",
+        "content": "two",
+        "metadata": {},
+        "options": [],
+    }
+    assert record["created_at"] <= record["updated_at"]
+
+
+def test_store_export_filters():
+    store = ConversationStore()
+    store.record("bot-a", "s1", _history("one"))
+    store.record("bot-b", "s2", _history("two"))
+    cutoff = json.loads(next(store.export_jsonl("bot-b")))["updated_at"]
+
+    assert len(list(store.export_jsonl(instance_name="bot-a"))) == 1
+    assert len(list(store.export_jsonl(start=cutoff))) == 1
+    assert len(list(store.export_jsonl(end=cutoff))) == 1
+    assert len(list(store.export_jsonl(start=cutoff + 1))) == 0
+
+
+def test_store_export_is_lazy():
+    store = ConversationStore()
+    store.record("bot-a", "s1", _history("one"))
+    export = store.export_jsonl()
+    # Conversations recorded before iteration starts are included
+    store.record("bot-a", "s2", _history("two"))
+    assert len(list(export)) == 2
+
+
+def test_store_import_roundtrip(tmp_path):
+    store = ConversationStore()
+    for i in range(5):
+        store.record("bot-a", f"s{i}", _history(str(i)))
+
+    path = tmp_path / "conversations.jsonl"
+    with open(path, "w") as f:
+        f.writelines(store.export_jsonl())
+
+    restored = ConversationStore()
+    with open(path) as f:
+        assert restored.import_jsonl(f, batch_size=2) == 5
+    assert len(restored) == 5
+    assert list(restored.export_jsonl()) == list(store.export_jsonl())
+
+
+def test_define_events_records_conversations():
+    store = ConversationStore()
+    config = FloatingChatbotConfig(
+        instance_name="bot-a", record_conversations=True
+    )
+    bot = FloatingChatbot(config)
+    with gr.Blocks():
+        bot.create_layout()
+        bot.define_events(sample_chatbot_response, conversation_store=store)
+    assert bot.conversations is store
+
+    submit = bot._make_submit_fn(sample_chatbot_response)
+    submit([], "hi", gr.Request(session_hash="s1"))
+    record = json.loads(next(bot.export_conversations()))
+    assert record["session_id"] == "s1"
+    assert record["messages"][1]["content"] == "Echo: hi"
+
+    assert bot.import_conversations(bot.export_conversations("bot-a")) == 1
+
+
+def test_define_events_default_store():
+    bot = FloatingChatbot(record_conversations=True)
+    with gr.Blocks():
+        bot.create_layout()
+        bot.define_events(sample_chatbot_response)
+    assert bot.conversations is default_conversation_store
+
+    # Recording is off by default
+    bot = FloatingChatbot()
+    with gr.Blocks():
+        bot.create_layout()
+        bot.define_events(sample_chatbot_response)
+    assert bot.conversations is None
+
+
+def test_submit_keeps_async_and_streaming_response_fn():
+    async def async_response(history, message):
+        return sample_chatbot_response(history, message)
+
+    def stream_response(history, message):
+        yield history, message
+        yield sample_chatbot_response(history, message)
+
+    store = ConversationStore()
+    bot = FloatingChatbot(instance_name="bot-a", record_conversations=True)
+    with gr.Blocks():
+        bot.create_layout()
+        bot.define_events(async_response, conversation_store=store)
+
+    request = gr.Request(session_hash="s1")
+    submit = bot._make_submit_fn(async_response)
+    assert inspect.iscoroutinefunction(submit)
+    history, _ = asyncio.run(submit([], "hi", request))
+    assert history[1].content == "Echo: hi"
+    assert len(store) == 1
+
+    submit = bot._make_submit_fn(stream_response)
+    assert inspect.isgeneratorfunction(submit)
+    assert len(list(submit([], "again", request))) == 2
+    # The last streamed history is recorded
+    record = json.loads(next(store.export_jsonl()))
+    assert record["messages"][1]["content"] == "Echo: again"
+
+
+def test_store_max_conversations():
+    store = ConversationStore(max_conversations=2)
+    store.record("bot-a", "s1", _history("one"))
+    store.record("bot-a", "s2", _history("two"))
+    # Updating s1 makes s2 the least recently updated
+    store.record("bot-a", "s1", _history("three"))
+    store.record("bot-a", "s3", _history("four"))
+
+    sessions = [c["session_id"] for c in store.iter_conversations()]
+    assert sessions == ["s1", "s3"]
+
+
+def test_store_max_age(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    store = ConversationStore(max_age=60)
+    store.record("bot-a", "s1", _history("one"))
+    now[0] += 30
+    store.record("bot-a", "s2", _history("two"))
+    now[0] += 40
+    store.record("bot-a", "s3", _history("three"))
+    assert [c["session_id"] for c in store.iter_conversations()] == [
+        "s2",
+        "s3",
+    ]
+
+    # Expired conversations are not imported
+    lines = [
+        json.dumps(
+            {
+                "instance_name": "bot-a",
+                "session_id": "old",
+                "created_at": 0,
+                "updated_at": 0,
+                "messages": [],
+            }
+        )
+    ]
+    assert store.import_jsonl(lines) == 0
+    assert len(store) == 2
+
+
+def _conversation(session_id, updated_at):
+    return json.dumps(
+        {
+            "instance_name": "bot-a",
+            "session_id": session_id,
+            "created_at": updated_at,
+            "updated_at": updated_at,
+            "messages": [],
+        }
+    )
+
+
+def test_store_import_keeps_update_order():
+    store = ConversationStore(max_conversations=2)
+    store.record("bot-a", "live1", _history("one"))
+    store.import_jsonl([_conversation("imported", 1.0)])
+    store.record("bot-a", "live2", _history("two"))
+
+    # The conversation imported from 1970 is dropped, not a live one
+    sessions = [c["session_id"] for c in store.iter_conversations()]
+    assert sessions == ["live1", "live2"]
+
+
+def test_store_import_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    store = ConversationStore(max_age=60)
+    store.record("bot-a", "live", _history("one"))
+    store.import_jsonl([_conversation("imported", 950.0)])
+    assert [c["session_id"] for c in store.iter_conversations()] == [
+        "imported",
+        "live",
+    ]
+
+    # Expires before the live conversation recorded after it
+    now[0] += 55
+    store.record("bot-a", "live2", _history("two"))
+    assert [c["session_id"] for c in store.iter_conversations()] == [
+        "live",
+        "live2",
+    ]
+
+
+def test_store_import_validates():
+    store = ConversationStore()
+    store.record("bot-a", "s1", _history("one"))
+    record = json.loads(next(store.export_jsonl()))
+    del record["updated_at"]
+
+    restored = ConversationStore()
+    with pytest.raises(ValueError, match="Line 2: .*'updated_at'"):
+        restored.import_jsonl(["\n", json.dumps(record)])
+    with pytest.raises(ValueError, match="Line 1: expected a JSON object"):
+        restored.import_jsonl(["[]"])
+    assert len(restored) == 0
+    # Nothing invalid was stored, so exports still work
+    assert list(restored.export_jsonl()) == []
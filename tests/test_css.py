@@ -0,0 +1,168 @@
+import gradio as gr
+
+from gradio_floating_chatbot import (
+    FloatingChatbot,
+    FloatingChatbotConfig,
+    build_css,
+    default_css,
+    minify_css,
+)
+
+
+CUSTOM = {
+    "use_default_css": False,
+    "container_class": "my-container",
+    "float_btn_class": "my-btn",
+    "panel_class": "my-panel",
+    "panel_header_row_class": "my-header",
+    "panel_title_class": "my-title",
+    "panel_close_btn_class": "my-close",
+    "panel_chat_class": "my-chat",
+    "panel_msg_txt_class": "my-msg",
+}
+
+
+def test_minify_css():
+    css = """
+    /* comment */
+    .a > .b , .c {
+      margin : 0 auto ;
+      color: red !important;
+    }
+    @media (max-width: 600px) { .a { width: calc(100% - 4px); } }
+    .a > .b , .c { margin: 0 auto; color: red !important; }
+    """
+    # The last copy of the duplicate rule is kept
+    assert minify_css(css) == (
+        "@media (max-width: 600px){.a{width:calc(100% - 4px)}}"
+        ".a>.b,.c{margin:0 auto;color:red!important}"
+    )
+
+
+def test_build_css_local_only():
+    css = build_css([FloatingChatbotConfig(anchor_mode="local")])
+    assert ".gfc-panel{" in css
+    assert ".gfc-panel .form{" in css
+    # Global anchoring rules are not needed
+    assert ".gfc-fixed" not in css
+    assert len(css) < len(default_css)
+
+
+def test_build_css_global():
+    css = build_css([FloatingChatbotConfig(anchor_mode="global")])
+    assert ".gfc-fixed{position:fixed!important" in css
+
+
+def test_build_css_dedupes_configs():
+    configs = [FloatingChatbotConfig() for _ in range(10)]
+    css = build_css(configs)
+    assert css == build_css(configs[:1])
+    assert css.count(".gfc-panel{") == 1
+
+
+def test_build_css_custom():
+    custom_css = ".my-panel { width: 300px; }\n.unrelated { color: red; }"
+    config = FloatingChatbotConfig(custom_css=custom_css, **CUSTOM)
+    css = build_css([config])
+    assert css == ".my-panel{width:300px}.unrelated{color:red}"
+
+    # Default rules are only included for configs using them
+    css = build_css([config, FloatingChatbotConfig()])
+    assert ".my-panel{width:300px}" in css
+    assert ".gfc-panel{" in css
+
+
+def test_build_css_extra_and_cache():
+    configs = [FloatingChatbotConfig()]
+    css = build_css(configs, extra_css=".app { margin: 0; }")
+    assert css.endswith(".app{margin:0}")
+    assert build_css(configs, extra_css=".app { margin: 0; }") is css
+
+
+def test_registered_configs():
+    config = FloatingChatbotConfig(
+        anchor_mode="global", custom_css=".registered { color: red; }"
+    )
+    bot = FloatingChatbot(config)
+    with gr.Blocks() as demo:
+        bot.create_layout()
+        bot.create_layout()
+        # Defaults to the Blocks being built
+        assert ".registered{color:red}" in FloatingChatbot.build_css()
+
+    assert FloatingChatbot.registered_configs[demo] == [config]
+    assert ".registered{color:red}" in FloatingChatbot.build_css(demo)
+
+    # Bots of other Blocks are not included
+    other = FloatingChatbot(FloatingChatbotConfig(**CUSTOM))
+    with gr.Blocks() as other_demo:
+        other.create_layout()
+    assert ".registered" not in FloatingChatbot.build_css(other_demo)
+    assert FloatingChatbot.build_css() == ""
+
+
+def test_minify_css_keeps_semicolons_in_values():
+    css = """
+    .a {
+      background: url("data:image/png;base64,AAAA") no-repeat;
+      content: "a;  b";
+      font-family: 'x;y', sans-serif;
+      mask: url(data:image/svg+xml;utf8,<svg></svg>);
+    }
+    """
+    assert minify_css(css) == (
+        '.a{background:url("data:image/png;base64,AAAA") no-repeat;'
+        'content:"a;  b";'
+        "font-family:'x;y', sans-serif;"
+        "mask:url(data:image/svg+xml;utf8,<svg></svg>)}"
+    )
+
+
+def test_minify_css_keeps_override_order():
+    css = ".a { color: red; } .a { color: blue; } .a { color: red; }"
+    # The last rule wins, so its copy is the one kept
+    assert minify_css(css) == ".a{color:blue}.a{color:red}"
+
+    config = FloatingChatbotConfig(custom_css=".gfc-panel { padding: 8px; }")
+    css = build_css([config])
+    # Overriding a default rule with a copy of an earlier one keeps it last
+    assert css.endswith(".gfc-panel{padding:8px}")
+
+
+def test_minify_css_at_rule_statements():
+    assert minify_css("@import url(x); .a{color:red}") == (
+        "@import url(x);.a{color:red}"
+    )
+    css = '@charset "utf-8";\n.a { content: "}{;"; }'
+    assert minify_css(css) == '@charset "utf-8";.a{content:"}{;"}'
+
+    # Statements from custom CSS go first, where browsers accept them
+    config = FloatingChatbotConfig(custom_css="@import url(x); .a{color:red}")
+    css = build_css([config])
+    assert css.startswith("@import url(x);.gfc-container{")
+    assert css.endswith(".a{color:red}")
+
+
+def test_build_css_registration_order():
+    custom = FloatingChatbotConfig(**CUSTOM, custom_css=".my-panel{top:0}")
+    css = build_css([custom, FloatingChatbotConfig()])
+    # The default CSS comes first, so custom rules override it
+    assert css.startswith(".gfc-container{")
+    assert css.endswith(".my-panel{top:0}")
+
+
+def test_build_css_filters_selector_lists():
+    config = FloatingChatbotConfig(
+        custom_css=".gfc-panel-title, .gfc-fixed { color: red; }"
+    )
+    css = build_css([config])
+    # Only the selector for the unused global class is dropped
+    assert css.endswith(".gfc-panel-title{color:red}")
+    assert ".gfc-fixed" not in css
+
+
+def test_build_css_global_without_default_css():
+    config = FloatingChatbotConfig(anchor_mode="global", **CUSTOM)
+    assert build_css([config]).startswith(".gfc-fixed{position:fixed")
+    config = FloatingChatbotConfig(anchor_mode="local", **CUSTOM)
+    assert build_css([config]) == ""
@@ -0,0 +1,114 @@
+import asyncio
+import inspect
+
+import gradio as gr
+from gradio.utils import check_function_inputs_match, get_type_hints
+
+from gradio_floating_chatbot.handlers import handler_kind, wrap_handler
+
+
+def _sync(history, message):
+    return history + [message], ""
+
+
+async def _async(history, message):
+    return history + [message], ""
+
+
+def _gen(history, message):
+    yield history + ["partial"], message
+    yield history + [message], ""
+
+
+async def _agen(history, message):
+    yield history + ["partial"], message
+    yield history + [message], ""
+
+
+class _Callable:
+    async def __call__(self, history, message):
+        return history, ""
+
+
+def test_handler_kind():
+    assert handler_kind(_sync) == "sync"
+    assert handler_kind(_async) == "async"
+    assert handler_kind(_gen) == "generator"
+    assert handler_kind(_agen) == "async_generator"
+    assert handler_kind(_Callable()) == "async"
+
+
+async def _collect(agen):
+    return [item async for item in agen]
+
+
+def test_wrap_handler_keeps_kind():
+    assert wrap_handler(_sync)([], "a") == (["a"], "")
+    assert asyncio.run(wrap_handler(_async)([], "a")) == (["a"], "")
+    assert list(wrap_handler(_gen)([], "a"))[-1] == (["a"], "")
+    updates = asyncio.run(_collect(wrap_handler(_agen)([], "a")))
+    assert updates[-1] == (["a"], "")
+
+
+def test_wrap_handler_hooks():
+    finished = []
+    handler = wrap_handler(
+        _gen,
+        prepare=lambda h, m, r: (h, m.upper()),
+        finish=lambda result, r: finished.append(result),
+    )
+    assert list(handler([], "a")) == [(["partial"], "A"), (["A"], "")]
+    assert finished == [(["A"], "")]
+
+    handler = wrap_handler(_async, shortcut=lambda h, m: (["short"], ""))
+    assert asyncio.run(handler([], "a")) == (["short"], "")
+
+
+def test_wrap_handler_request_signature():
+    handler = wrap_handler(
+        _sync,
+        prepare=lambda h, m, request: (h, request.session_hash),
+        with_request=True,
+    )
+    params = inspect.signature(handler).parameters
+    assert params["request"].annotation is gr.Request
+    # Gradio passes the request and does not count it as an input
+    assert get_type_hints(handler)["request"] is gr.Request
+    assert check_function_inputs_match(handler, [None, None], False) is None
+    assert handler([], "a", gr.Request(session_hash="s1")) == (["s1"], "")
+
+    # Without a request the signature of the wrapped function is kept
+    assert list(inspect.signature(wrap_handler(_sync)).parameters) == [
+        "history",
+        "message",
+    ]
+
+
+def test_wrap_handler_closes_generator():
+    closed = []
+
+    def gen(history, message):
+        try:
+            yield history, message
+            yield history, ""
+        finally:
+            closed.append("sync")
+
+    async def agen(history, message):
+        try:
+            yield history, message
+            yield history, ""
+        finally:
+            closed.append("async")
+
+    updates = wrap_handler(gen)([], "a")
+    next(updates)
+    updates.close()
+
+    async def close_early():
+        updates = wrap_handler(agen)([], "a")
+        await updates.__anext__()
+        await updates.aclose()
+
+    asyncio.run(close_early())
+    assert closed == ["sync", "async"]
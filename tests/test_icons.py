@@ -0,0 +1,115 @@
+import asyncio
+
+import gradio as gr
+import PIL.Image
+from fastapi.testclient import TestClient
+from starlette.middleware import Middleware
+
+from gradio_floating_chatbot import (
+    FloatingChatbot,
+    FloatingChatbotConfig,
+    IconCache,
+    IconCacheMiddleware,
+)
+
+
+def _image(path, size=(256, 128), color="red"):
+    PIL.Image.new("RGB", size, color).save(path)
+    return str(path)
+
+
+def test_icon_cache_dedupes_by_content(tmp_path):
+    cache = IconCache(str(tmp_path / "cache"))
+    icon_a = _image(tmp_path / "a.png")
+    icon_b = _image(tmp_path / "b.png")
+    icon_c = _image(tmp_path / "c.png", color="blue")
+
+    prepared = cache.prepare(icon_a)
+    assert prepared == cache.prepare(icon_b)
+    assert prepared != cache.prepare(icon_c)
+    assert prepared.endswith(".png")
+    assert len(list((tmp_path / "cache").iterdir())) == 2
+
+
+def test_icon_cache_resize(tmp_path):
+    cache = IconCache(str(tmp_path / "cache"))
+    prepared = cache.prepare(_image(tmp_path / "a.jpg"), size=32)
+
+    assert prepared.endswith("-32.png")
+    with PIL.Image.open(prepared) as img:
+        assert img.format == "PNG"
+        assert img.size == (32, 16)
+
+
+def test_icon_cache_resize_svg(tmp_path):
+    cache = IconCache(str(tmp_path / "cache"))
+    svg = '<svg xmlns="http://www.w3.org/2000/svg" width="64" height="64"/>'
+    (tmp_path / "a.svg").write_text(svg)
+    prepared = cache.prepare(str(tmp_path / "a.svg"), size=32)
+
+    # Pillow cannot open SVGs, so it is served unchanged
+    assert prepared.endswith(".svg")
+    with open(prepared) as f:
+        assert f.read() == svg
+
+
+def test_icon_cache_passthrough(tmp_path):
+    cache = IconCache(str(tmp_path / "cache"))
+    url = "https://example.com/bot-icon.png"
+    assert cache.prepare(url) == url
+    assert cache.prepare("path/to/icon.png") == "path/to/icon.png"
+
+
+def test_icon_cache_middleware(tmp_path):
+    icon = _image(tmp_path / "icon.png")
+    with gr.Blocks() as demo:
+        for _ in range(2):
+            config = FloatingChatbotConfig(icon=icon, icon_type="image")
+            FloatingChatbot(config).create_layout()
+
+    app = gr.routes.App.create_app(
+        demo, app_kwargs={"middleware": [Middleware(IconCacheMiddleware)]}
+    )
+    with TestClient(app) as client:
+        config = client.get("/config").json()
+        urls = {
+            c["props"]["icon"]["url"]
+            for c in config["components"]
+            if c["type"] == "button" and c["props"].get("icon")
+        }
+        # Both bots share one icon URL
+        assert len(urls) == 1
+
+        response = client.get(urls.pop().removeprefix(config["root"]))
+        assert response.status_code == 200
+        assert "immutable" in response.headers["cache-control"]
+
+        # Other routes are left alone
+        response = client.get("/config")
+        assert "immutable" not in response.headers.get("cache-control", "")
+
+
+def test_icon_cache_middleware_matches_file_name():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200})
+
+    middleware = IconCacheMiddleware(app)
+
+    def cache_control(path):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "path": path}
+        asyncio.run(middleware(scope, None, send))
+        return dict(sent[0].get("headers", [])).get(b"cache-control")
+
+    digest = "0123456789abcdef"
+    assert cache_control(f"/gradio_api/file=/tmp/gfc-icon-{digest}.png")
+    assert cache_control(f"/gradio_api/file=/tmp/gfc-icon-{digest}-32.png")
+    assert cache_control(f"/gradio_api/file=/tmp/gfc-icon-{digest}")
+    # The prefix elsewhere in the path is not enough
+    assert not cache_control(f"/gradio_api/file=/tmp/gfc-icon-{digest}/a.js")
+    assert not cache_control("/gradio_api/file=/tmp/gfc-icon-report.html")
+    assert not cache_control("/gfc-icon-/config")
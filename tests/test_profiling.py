@@ -0,0 +1,165 @@
+import asyncio
+import cProfile
+import inspect
+import pstats
+
+import gradio as gr
+
+from gradio_floating_chatbot import (
+    FloatingChatbot,
+    FloatingChatbotConfig,
+    SampledProfiler,
+    sample_chatbot_response,
+)
+
+
+def test_profiler_disabled(tmp_path):
+    profiler = SampledProfiler(str(tmp_path / "profiles"))
+    assert profiler.enabled is False
+
+    fn = profiler.wrap(sample_chatbot_response, "bot")
+    history, _ = fn([], "hi")
+    assert history[1].content == "Echo: hi"
+    assert not (tmp_path / "profiles").exists()
+
+
+def test_profiler_sampling(tmp_path):
+    profiler = SampledProfiler(str(tmp_path), sample_rate=2)
+    fn_a = profiler.wrap(sample_chatbot_response, "bot-a")
+    fn_b = profiler.wrap(sample_chatbot_response, "bot-b")
+
+    for _ in range(4):
+        fn_a([], "hi")
+    fn_b([], "hi")
+
+    # 1 in 2 calls per instance_name
+    reports = sorted(p.name for p in tmp_path.iterdir())
+    assert len(reports) == 2
+    assert all(r.startswith("bot-a-") for r in reports)
+    stats = pstats.Stats(str(tmp_path / reports[0]))
+    assert stats.total_calls > 0
+
+
+def test_profiler_runtime_toggle(tmp_path):
+    profiler = SampledProfiler(str(tmp_path))
+    fn = profiler.wrap(sample_chatbot_response, "bot")
+
+    fn([], "hi")
+    profiler.set_sample_rate(1)
+    assert profiler.enabled is True
+    fn([], "hi")
+    profiler.disable()
+    fn([], "hi")
+
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_define_events_profiler(tmp_path):
+    config = FloatingChatbotConfig(
+        profile_sample_rate=5, profile_dir=str(tmp_path)
+    )
+    bot = FloatingChatbot(config)
+    with gr.Blocks():
+        bot.create_layout()
+        bot.define_events(sample_chatbot_response)
+
+    assert bot.profiler.sample_rate == 5
+    assert bot.profiler.output_dir == str(tmp_path)
+
+    # A shared profiler can be passed in instead
+    shared = SampledProfiler()
+    bot2 = FloatingChatbot()
+    with gr.Blocks():
+        bot2.create_layout()
+        bot2.define_events(sample_chatbot_response, profiler=shared)
+    assert bot2.profiler is shared
+
+
+def test_profiler_shared_lock(tmp_path):
+    profiler_a = SampledProfiler(str(tmp_path / "a"), sample_rate=1)
+    profiler_b = SampledProfiler(str(tmp_path / "b"), sample_rate=1)
+
+    def inner(history, message):
+        return profiler_b.wrap(sample_chatbot_response, "bot-b")(
+            history, message
+        )
+
+    # The nested sample runs unprofiled instead of raising
+    history, _ = profiler_a.wrap(inner, "bot-a")([], "hi")
+    assert history[1].content == "Echo: hi"
+    assert len(list((tmp_path / "a").iterdir())) == 1
+    assert not (tmp_path / "b").exists()
+
+
+def test_profiler_other_tool_active(tmp_path, monkeypatch):
+    class BusyProfile(cProfile.Profile):
+        def enable(self, *args, **kwargs):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(cProfile, "Profile", BusyProfile)
+    profiler = SampledProfiler(str(tmp_path), sample_rate=1)
+    history, _ = profiler.wrap(sample_chatbot_response, "bot")([], "hi")
+    assert history[1].content == "Echo: hi"
+    assert not list(tmp_path.iterdir())
+
+
+def test_profiler_keeps_handler_kind(tmp_path):
+    async def async_fn(history, message):
+        return sample_chatbot_response(history, message)
+
+    def stream_fn(history, message):
+        yield history, message
+        yield sample_chatbot_response(history, message)
+
+    profiler = SampledProfiler(str(tmp_path), sample_rate=1)
+    wrapped = profiler.wrap(async_fn, "bot-async")
+    assert inspect.iscoroutinefunction(wrapped)
+    history, _ = asyncio.run(wrapped([], "hi"))
+    assert history[1].content == "Echo: hi"
+
+    wrapped = profiler.wrap(stream_fn, "bot-stream")
+    assert inspect.isgeneratorfunction(wrapped)
+    assert len(list(wrapped([], "hi"))) == 2
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_define_events_profiles_backends(tmp_path):
+    config = FloatingChatbotConfig(
+        instance_name="bot", profile_sample_rate=1, profile_dir=str(tmp_path)
+    )
+    bot = FloatingChatbot(config)
+    with gr.Blocks():
+        bot.create_layout()
+        bot.define_events([sample_chatbot_response, sample_chatbot_response])
+
+    bot.router([], "hi")
+    reports = [p.name for p in tmp_path.iterdir()]
+    assert len(reports) == 1
+    assert reports[0].startswith("bot-backend0-")
+
+
+def test_define_events_profiles_response_fn_only(tmp_path):
+    faq = tmp_path / "faq.json"
+    faq.write_text('[{"question": "opening hours", "answer": "9 to 5"}]')
+    config = FloatingChatbotConfig(
+        instance_name="bot",
+        faq_path=str(faq),
+        priority=1,
+        profile_sample_rate=1,
+        profile_dir=str(tmp_path / "profiles"),
+    )
+    bot = FloatingChatbot(config)
+    with gr.Blocks() as demo:
+        bot.create_layout()
+        bot.define_events(sample_chatbot_response)
+    submit = list(demo.fns.values())[-1].fn
+    request = gr.Request(session_hash="s1")
+
+    # FAQ answers skip the scheduler and the profiler
+    history, _ = asyncio.run(submit([], "opening hours", request))
+    assert history[1].content == "9 to 5"
+    assert not (tmp_path / "profiles").exists()
+
+    history, _ = asyncio.run(submit([], "hi", request))
+    assert history[1].content == "Echo: hi"
+    assert len(list((tmp_path / "profiles").iterdir())) == 1
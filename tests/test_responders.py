@@ -0,0 +1,173 @@
+import asyncio
+import inspect
+import json
+
+import gradio as gr
+import pytest
+
+from gradio_floating_chatbot import (
+    FAQResponder,
+    FloatingChatbot,
+    FloatingChatbotConfig,
+    ResponderChain,
+)
+
+
+FAQ = [
+    {
+        "question": "How do I reset my password?",
+        "answer": "Use the 'Forgot password' link on the login page.",
+    },
+    {
+        "questions": ["What are your opening hours?", "When are you open?"],
+        "answer": "We are open 9am to 5pm, Monday to Friday.",
+    },
+]
+
+
+def _fallback(history, message):
+    return history + [gr.ChatMessage(role="assistant", content="fallback")], ""
+
+
+def test_faq_lookup_match():
+    faq = FAQResponder(FAQ)
+    assert faq.lookup("how can I reset my password") == FAQ[0]["answer"]
+    assert faq.lookup("when are you open") == FAQ[1]["answer"]
+
+
+def test_faq_lookup_no_match():
+    faq = FAQResponder(FAQ)
+    assert faq.lookup("tell me a joke") is None
+    assert faq.lookup("") is None
+
+
+def test_faq_lookup_off_intent():
+    faq = FAQResponder(
+        FAQ
+        + [
+            {
+                "question": "How do I delete my account?",
+                "answer": "Settings > Delete.",
+            }
+        ]
+    )
+    # Longer questions that only share a few terms with an entry
+    assert (
+        faq.lookup(
+            "I reset my password yesterday but now the app crashes on "
+            "login every time, what is wrong?"
+        )
+        is None
+    )
+    assert (
+        faq.lookup(
+            "do not delete my account, how do I upgrade the account plan "
+            "instead?"
+        )
+        is None
+    )
+    assert faq.lookup("how do I delete my account") == "Settings > Delete."
+
+
+def test_faq_min_score():
+    # A partial match is accepted with a low threshold only
+    assert FAQResponder(FAQ, min_score=0.1).lookup("password") is not None
+    assert FAQResponder(FAQ, min_score=0.9).lookup("password") is None
+
+
+def test_faq_from_file(tmp_path):
+    path = tmp_path / "faq.json"
+    path.write_text(json.dumps(FAQ))
+    faq = FAQResponder.from_file(str(path))
+    assert faq.lookup("reset password") == FAQ[0]["answer"]
+
+
+def test_responder_chain():
+    chain = ResponderChain([FAQResponder(FAQ)], _fallback)
+
+    history, cleared = chain([], "reset my password")
+    assert cleared == ""
+    assert history[0].role == "user"
+    assert history[1].content == FAQ[0]["answer"]
+
+    history, _ = chain([], "tell me a joke")
+    assert history[0].content == "fallback"
+
+
+def test_chatbot_faq_path(tmp_path):
+    path = tmp_path / "faq.yaml"
+    path.write_text(json.dumps(FAQ))  # JSON is valid YAML
+    config = FloatingChatbotConfig(faq_path=str(path))
+    bot = FloatingChatbot(config)
+
+    chain = bot.build_responder_chain(_fallback)
+    assert chain.responders == [bot.faq_responder]
+    # The index is built only once
+    assert bot.build_responder_chain(_fallback).responders[0] is (
+        bot.faq_responder
+    )
+
+    history, _ = chain([], "opening hours")
+    assert history[1].content == FAQ[1]["answer"]
+
+
+def test_responder_chain_multimodal():
+    chain = ResponderChain([FAQResponder(FAQ)], _fallback)
+
+    history, _ = chain([], {"text": "reset my password", "files": []})
+    assert history[1].content == FAQ[0]["answer"]
+
+    # Messages with attachments skip the FAQ
+    history, _ = chain([], {"text": "reset my password", "files": ["a.txt"]})
+    assert history[0].content == "fallback"
+
+
+def test_responder_chain_async_fallback():
+    async def fallback(history, message):
+        return _fallback(history, message)
+
+    handler = ResponderChain([FAQResponder(FAQ)], fallback).handler()
+    assert inspect.iscoroutinefunction(handler)
+
+    history, _ = asyncio.run(handler([], "reset my password"))
+    assert history[1].content == FAQ[0]["answer"]
+    history, _ = asyncio.run(handler([], "tell me a joke"))
+    assert history[0].content == "fallback"
+
+
+def test_responder_chain_generator_fallback():
+    def fallback(history, message):
+        yield history + [gr.ChatMessage(role="assistant", content="fall")], ""
+        yield _fallback(history, message)
+
+    handler = ResponderChain([FAQResponder(FAQ)], fallback).handler()
+    assert inspect.isgeneratorfunction(handler)
+
+    updates = list(handler([], "reset my password"))
+    assert len(updates) == 1
+    assert updates[0][0][1].content == FAQ[0]["answer"]
+
+    updates = list(handler([], "tell me a joke"))
+    assert [u[0][0].content for u in updates] == ["fall", "fallback"]
+
+
+def test_define_events_without_responders():
+    async def response_fn(history, message):
+        return history, ""
+
+    bot = FloatingChatbot()
+    with gr.Blocks():
+        bot.create_layout()
+        bot.define_events(response_fn)
+    assert bot.faq_responder is None
+
+
+def test_faq_from_file_invalid(tmp_path):
+    path = tmp_path / "faq.yaml"
+    path.write_text("")
+    with pytest.raises(ValueError, match="non-empty list of entries"):
+        FAQResponder.from_file(str(path))
+
+    path.write_text("- answer: no question")
+    with pytest.raises(ValueError, match="FAQ entry 0"):
+        FAQResponder.from_file(str(path))
@@ -0,0 +1,162 @@
+import time
+
+import gradio as gr
+import pytest
+
+from gradio_floating_chatbot import (
+    FloatingChatbot,
+    HedgedRouter,
+    LatencyTracker,
+    RoutingPolicy,
+)
+
+
+def _backend(name, delay=0.0, error=None, calls=None):
+    def fn(history, message):
+        if calls is not None:
+            calls.append(name)
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        return history + [gr.ChatMessage(role="assistant", content=name)], ""
+
+    return fn
+
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker(window_size=10)
+    assert tracker.percentile(0.95) is None
+    for i in range(1, 21):
+        tracker.record(i / 100)
+    # Only the last 10 samples are kept
+    assert len(tracker) == 10
+    assert tracker.percentile(0.0) == pytest.approx(0.11)
+    assert tracker.percentile(0.95) == pytest.approx(0.20)
+
+
+def test_router_primary():
+    calls = []
+    router = HedgedRouter(
+        [_backend("primary", calls=calls), _backend("secondary", calls=calls)]
+    )
+    history, _ = router([], "hi")
+    assert history[0].content == "primary"
+    assert calls == ["primary"]
+    assert len(router.trackers[0]) == 1
+
+
+def test_router_failover():
+    calls = []
+    router = HedgedRouter(
+        [
+            _backend("primary", error=RuntimeError("down"), calls=calls),
+            _backend("secondary", calls=calls),
+        ]
+    )
+    history, _ = router([], "hi")
+    assert history[0].content == "secondary"
+    assert calls == ["primary", "secondary"]
+
+
+def test_router_all_fail():
+    router = HedgedRouter(
+        [
+            _backend("primary", error=RuntimeError("first")),
+            _backend("secondary", error=RuntimeError("second")),
+        ]
+    )
+    with pytest.raises(RuntimeError, match="second"):
+        router([], "hi")
+
+
+def test_router_hedges_slow_primary():
+    policy = RoutingPolicy(min_samples=1, initial_hedge_delay=10.0)
+    router = HedgedRouter(
+        [_backend("primary", delay=0.5), _backend("secondary")], policy
+    )
+    # Warm up the primary's latency window with fast calls
+    for _ in range(5):
+        router.trackers[0].record(0.01)
+
+    start = time.perf_counter()
+    history, _ = router([], "hi")
+    assert history[0].content == "secondary"
+    assert time.perf_counter() - start < 0.4
+
+
+def test_router_fails_over_while_hedging():
+    policy = RoutingPolicy(min_samples=1, initial_hedge_delay=10.0)
+    router = HedgedRouter(
+        [
+            _backend("primary", delay=0.5),
+            _backend("secondary", error=RuntimeError("down")),
+            _backend("tertiary"),
+        ],
+        policy,
+    )
+    router.trackers[0].record(0.01)
+
+    # The secondary fails while the primary is still running, so the
+    # tertiary is started without waiting for the primary.
+    start = time.perf_counter()
+    history, _ = router([], "hi")
+    assert history[0].content == "tertiary"
+    assert time.perf_counter() - start < 0.4
+
+
+def test_router_no_hedge():
+    policy = RoutingPolicy(hedge=False)
+    router = HedgedRouter(
+        [_backend("primary", delay=0.05), _backend("secondary")], policy
+    )
+    history, _ = router([], "hi")
+    assert history[0].content == "primary"
+
+
+def test_router_cancels_queued_loser():
+    policy = RoutingPolicy(min_samples=1, max_workers=1)
+    router = HedgedRouter(
+        [_backend("primary", delay=0.05), _backend("secondary")], policy
+    )
+    router.trackers[0].record(0.001)
+    # With one worker the hedged call stays queued and is cancelled
+    history, _ = router([], "hi")
+    assert history[0].content == "primary"
+    assert len(router.trackers[1]) == 0
+
+
+def test_router_requires_backends():
+    with pytest.raises(ValueError, match="at least one backend"):
+        HedgedRouter([])
+
+
+def test_router_rejects_async_backends():
+    async def async_backend(history, message):
+        return history, ""
+
+    def stream_backend(history, message):
+        yield history, ""
+
+    for backend in (async_backend, stream_backend):
+        with pytest.raises(TypeError, match="must be sync functions"):
+            HedgedRouter([_backend("primary"), backend])
+
+    bot = FloatingChatbot()
+    with gr.Blocks():
+        bot.create_layout()
+        with pytest.raises(TypeError, match="must be sync functions"):
+            bot.define_events([_backend("primary"), async_backend])
+
+
+def test_define_events_multiple_backends():
+    bot = FloatingChatbot()
+    with gr.Blocks():
+        bot.create_layout()
+        bot.define_events(
+            [_backend("primary"), _backend("secondary")],
+            routing_policy=RoutingPolicy(hedge=False),
+        )
+
+    assert isinstance(bot.router, HedgedRouter)
+    assert len(bot.router.backends) == 2
+    assert bot.router.policy.hedge is False
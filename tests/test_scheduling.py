@@ -0,0 +1,223 @@
+import asyncio
+import threading
+import time
+
+import anyio
+import gradio as gr
+import pytest
+
+from gradio_floating_chatbot import (
+    FloatingChatbot,
+    FloatingChatbotConfig,
+    PriorityScheduler,
+    default_scheduler,
+    sample_chatbot_response,
+)
+
+
+async def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        await asyncio.sleep(0.001)
+
+
+async def _run_queued(scheduler, requests):
+    # Hold the only slot, queue the requests in order, then release it.
+    order = []
+    release = asyncio.Event()
+    blocker = asyncio.create_task(scheduler.wrap(release.wait, "blocker", 1)())
+    await _wait_for(lambda: scheduler.active == 1)
+
+    async def append(name):
+        order.append(name)
+
+    tasks = []
+    for i, (name, priority) in enumerate(requests):
+        fn = scheduler.wrap(append, name, priority)
+        tasks.append(asyncio.create_task(fn(name)))
+        await _wait_for(
+            lambda i=i: sum(scheduler.queue_depth().values()) == i + 1
+        )
+
+    release.set()
+    await asyncio.wait_for(asyncio.gather(blocker, *tasks), timeout=2.0)
+    return order
+
+
+@pytest.mark.asyncio
+async def test_scheduler_queue_depth():
+    scheduler = PriorityScheduler(max_concurrency=1)
+    release = asyncio.Event()
+    tasks = [
+        asyncio.create_task(scheduler.wrap(release.wait, name, prio)())
+        for name, prio in [("a", 1), ("b", 1), ("c", 3)]
+    ]
+    await _wait_for(lambda: sum(scheduler.queue_depth().values()) == 2)
+    assert scheduler.active == 1
+
+    release.set()
+    await asyncio.wait_for(asyncio.gather(*tasks), timeout=2.0)
+    assert scheduler.queue_depth() == {}
+    assert scheduler.active == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_weighted_fair_queuing():
+    scheduler = PriorityScheduler(max_concurrency=1)
+    order = await _run_queued(
+        scheduler,
+        [("low", 1), ("low", 1), ("low", 1)]
+        + [("high", 2), ("high", 2), ("high", 2), ("high", 2)],
+    )
+    # High priority gets 2x the share, but low is not starved
+    assert order == ["high", "low", "high", "high", "low", "high", "low"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_starvation_protection():
+    scheduler = PriorityScheduler(max_concurrency=1, max_wait=0.0)
+    order = await _run_queued(
+        scheduler, [("low", 1), ("high", 10), ("high", 10)]
+    )
+    # Every ticket has waited past max_wait, so the oldest goes first
+    assert order == ["low", "high", "high"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_concurrency():
+    scheduler = PriorityScheduler(max_concurrency=2)
+    release = asyncio.Event()
+    tasks = [
+        asyncio.create_task(scheduler.wrap(release.wait, "a", 1)())
+        for _ in range(3)
+    ]
+    await _wait_for(lambda: scheduler.queue_depth() == {1: 1})
+    assert scheduler.active == 2
+    release.set()
+    await asyncio.wait_for(asyncio.gather(*tasks), timeout=2.0)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_cancelled_waiter():
+    scheduler = PriorityScheduler(max_concurrency=1)
+    release = asyncio.Event()
+    holder = asyncio.create_task(scheduler.wrap(release.wait, "a", 1)())
+    waiter = asyncio.create_task(scheduler.wrap(release.wait, "b", 1)())
+    await _wait_for(lambda: scheduler.queue_depth() == {1: 1})
+
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    assert scheduler.queue_depth() == {}
+    # The cancelled call does not count against b's share
+    assert "b" not in scheduler._last_finish
+    release.set()
+    await holder
+    assert scheduler.active == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_waiters_do_not_hold_threads():
+    # Far more waiting calls than worker threads
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = 4
+    scheduler = PriorityScheduler(max_concurrency=1)
+    release = threading.Event()
+
+    def slow(history, message):
+        release.wait(timeout=2.0)
+        return sample_chatbot_response(history, message)
+
+    fn = scheduler.wrap(slow, "bot", 1)
+    tasks = [asyncio.create_task(fn([], str(i))) for i in range(20)]
+    await _wait_for(lambda: sum(scheduler.queue_depth().values()) == 19)
+    await _wait_for(lambda: limiter.borrowed_tokens == 1)
+    # Only the running call uses a thread, others can still get one
+    await asyncio.sleep(0.05)
+    assert limiter.borrowed_tokens == 1
+    assert await anyio.to_thread.run_sync(lambda: "free") == "free"
+
+    release.set()
+    results = await asyncio.wait_for(asyncio.gather(*tasks), timeout=5.0)
+    assert [history[1].content for history, _ in results] == [
+        f"Echo: {i}" for i in range(20)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_keeps_streaming():
+    scheduler = PriorityScheduler()
+
+    def stream(history, message):
+        yield history, message
+        yield sample_chatbot_response(history, message)
+
+    updates = [u async for u in scheduler.wrap(stream, "bot", 1)([], "hi")]
+    assert len(updates) == 2
+    assert updates[1][0][1].content == "Echo: hi"
+    assert scheduler.active == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_releases_closed_stream():
+    scheduler = PriorityScheduler(max_concurrency=1)
+
+    async def stream(history, message):
+        yield history, message
+        yield sample_chatbot_response(history, message)
+
+    updates = scheduler.wrap(stream, "bot", 1)([], "hi")
+    await updates.__anext__()
+    assert scheduler.active == 1
+    # The user stops the reply before it finishes
+    await updates.aclose()
+    assert scheduler.active == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_cancelled_waiter_keeps_share():
+    scheduler = PriorityScheduler(max_concurrency=1)
+    release = asyncio.Event()
+    holder = asyncio.create_task(scheduler.wrap(release.wait, "a", 1)())
+    await _wait_for(lambda: scheduler.active == 1)
+    first = asyncio.create_task(scheduler.wrap(release.wait, "b", 1)())
+    await _wait_for(lambda: scheduler.queue_depth() == {1: 1})
+    finish = scheduler._last_finish["b"]
+
+    second = asyncio.create_task(scheduler.wrap(release.wait, "b", 1)())
+    await _wait_for(lambda: scheduler.queue_depth() == {1: 2})
+    second.cancel()
+    await asyncio.gather(second, return_exceptions=True)
+    assert scheduler._last_finish["b"] == finish
+
+    release.set()
+    await asyncio.wait_for(asyncio.gather(holder, first), timeout=2.0)
+
+
+def test_scheduler_rejects_priority():
+    with pytest.raises(ValueError, match="at least 1"):
+        PriorityScheduler().wrap(sample_chatbot_response, "bot", 0)
+    with pytest.raises(ValueError, match="'priority' must be at least 1"):
+        FloatingChatbotConfig(priority=0)
+
+
+def test_define_events_priority():
+    scheduler = PriorityScheduler()
+    bot = FloatingChatbot(FloatingChatbotConfig(priority=5))
+    with gr.Blocks():
+        bot.create_layout()
+        bot.define_events(sample_chatbot_response, scheduler=scheduler)
+    assert bot.scheduler is scheduler
+
+    bot = FloatingChatbot(FloatingChatbotConfig(priority=1))
+    with gr.Blocks():
+        bot.create_layout()
+        bot.define_events(sample_chatbot_response)
+    assert bot.scheduler is default_scheduler
+
+    # No priority, no scheduling
+    bot = FloatingChatbot()
+    with gr.Blocks():
+        bot.create_layout()
+        bot.define_events(sample_chatbot_response)
+    assert bot.scheduler is None